@@ -0,0 +1,32 @@
+EXCERPT_LENGTH = 50
+EXCERPT_SUFFIX = " ..."
+
+
+def make_excerpt(content: str) -> str:
+    """Beginning of the content, which is shown in post lists"""
+    content = content or ''
+    if len(content) > EXCERPT_LENGTH:
+        return f"{content[:EXCERPT_LENGTH]}{EXCERPT_SUFFIX}"
+    return content
+
+
+def backfill_excerpts(model, full: bool = False, batch_size: int = 1000) -> int:
+    """Set excerpts of posts without excerpt, or all posts if `full` is `True`.
+
+    Returns number of updated posts.
+    """
+    posts = model.objects.all() if full else model.objects.filter(excerpt='')
+
+    count = 0
+    last_pk = 0
+    while True:
+        batch = list(posts.filter(pk__gt=last_pk).order_by('pk').values_list('pk', 'content')[:batch_size])
+        if not batch:
+            return count
+
+        model.objects.bulk_update(
+            [model(pk=pk, excerpt=make_excerpt(content)) for pk, content in batch],
+            fields=['excerpt'],
+        )
+        count += len(batch)
+        last_pk = batch[-1][0]
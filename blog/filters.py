@@ -1,11 +1,48 @@
 from django.core.exceptions import ValidationError
-from django_filters.rest_framework import FilterSet
+from django_filters.rest_framework import BaseInFilter, CharFilter, ChoiceFilter, FilterSet, NumberFilter
 from django.forms import Form
+from rest_framework.exceptions import ValidationError as APIValidationError
+from rest_framework.filters import SearchFilter
 
 from .models import Category, Post
+from social.utils import get_tagged_object_ids
+from .search import search_posts, tokenize
+
+
+class NumberInFilter(BaseInFilter, NumberFilter):
+    pass
+
+
+class CharInFilter(BaseInFilter, CharFilter):
+    pass
 
 
 class PostFilter(FilterSet):
+    tag = NumberFilter(method='filter_tags', label="Tag id")
+    tag__in = NumberInFilter(method='filter_tags', label="Comma separated tag ids")
+    tag_label = CharInFilter(method='filter_tags', label="Comma separated tag labels")
+    tag_mode = ChoiceFilter(
+        choices=[('any', 'Any'), ('all', 'All')], method='filter_tag_mode',
+        label="Posts with any (default) or all of the tags",
+    )
+
+    tag_fields = {
+        'tag': 'tag_id',
+        'tag__in': 'tag_id',
+        'tag_label': 'tag__label',
+    }
+
+    def filter_tags(self, queryset, name, value):
+        values = value if isinstance(value, list) else [value]
+        match_all = self.form.cleaned_data.get('tag_mode') == 'all'
+        return queryset.filter(pk__in=get_tagged_object_ids(
+            Post, values, field=self.tag_fields[name], match_all=match_all
+        ))
+
+    def filter_tag_mode(self, queryset, name, value):
+        # Used by `filter_tags`
+        return queryset
+
     class Meta:
         model = Post
         fields = {
@@ -16,6 +53,48 @@ class PostFilter(FilterSet):
         }
 
 
+class PostSearchFilter(SearchFilter):
+    """Searches posts by `icontains` lookups on `search_fields` like `SearchFilter`.
+
+    `search_mode=fulltext` searches whole words in the search index and orders posts by relevance.
+    """
+    search_mode_param = 'search_mode'
+    search_modes = ['contains', 'fulltext']
+
+    def get_search_mode(self, request) -> str:
+        mode = request.query_params.get(self.search_mode_param, self.search_modes[0])
+        if mode not in self.search_modes:
+            raise APIValidationError({self.search_mode_param: f"Choose one of {', '.join(self.search_modes)}"})
+        return mode
+
+    def get_index_terms(self, request) -> list[str]:
+        """Terms that are searched in the index, `None` if index is not used.
+
+        Searches without any indexable term, like an empty one,
+        are left to `SearchFilter` same as before the index.
+        """
+        if self.search_param not in request.query_params or self.get_search_mode(request) != 'fulltext':
+            return None
+        return tokenize(request.query_params[self.search_param]) or None
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_index_terms(request)
+        if terms is None:
+            return super().filter_queryset(request, queryset, view)
+        return search_posts(queryset, terms).order_by('-search_rank', '-pk')
+
+    def get_schema_operation_parameters(self, view):
+        return super().get_schema_operation_parameters(view) + [
+            {
+                'name': self.search_mode_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Search in relevance ranked index or by substrings',
+                'schema': {'type': 'string', 'enum': self.search_modes},
+            },
+        ]
+
+
 class RUDForm(Form):
     def clean(self):
         cleaned_data = super().clean()
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from blog.excerpts import backfill_excerpts
+from core.versions import bump_model_version
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = "Set stored excerpts of posts that don't have one"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help="Set excerpts of all posts again")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        count = backfill_excerpts(Post, full=options['full'], batch_size=options['batch_size'])
+        bump_model_version(Post)
+        self.stdout.write(self.style.SUCCESS(f"{count} post excerpts set"))
@@ -0,0 +1,80 @@
+import time
+from uuid import uuid4
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+from blog.mixins import PostDefaultsMixin
+from blog.models import Category, Post, User
+from blog.serializers import PostInfoSerializer
+from social.models import Counter, Tag, TaggedItem
+
+
+class GenericPostInfoSerializer(PostInfoSerializer):
+    """Serializes posts with a serializer per post"""
+
+    class Meta(PostInfoSerializer.Meta):
+        list_serializer_class = serializers.ListSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare generic and compiled post list serializers over pages of posts "
+        "with authors, tags and counters. written posts are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-size', type=int, default=100)
+        parser.add_argument('--tags', type=int, default=3, help="Tags per post")
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            posts = self._create_posts(options['page_size'], options['tags'])
+            self._run(posts, options['repeat'])
+            transaction.set_rollback(True)
+
+    def _run(self, posts, repeat):
+        context = {'view_counts': {post.pk: post.pk % 7 for post in posts}}
+        generic = self._measure(GenericPostInfoSerializer, posts, context, repeat)
+        compiled = self._measure(PostInfoSerializer, posts, context, repeat)
+        if generic[1] != compiled[1]:
+            raise CommandError("Outputs are different")
+
+        self.stdout.write(
+            f"{len(posts)} posts: generic {generic[0] * 1000:.1f}ms, "
+            f"compiled {compiled[0] * 1000:.1f}ms ({generic[0] / compiled[0]:.1f}x)"
+        )
+        self.stdout.write(self.style.SUCCESS("Outputs are identical"))
+
+    def _measure(self, serializer_class, posts, context, repeat):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            rendered = JSONRenderer().render(serializer_class(posts, many=True, context=context).data)
+            duration = time.perf_counter() - started
+            best = duration if best is None else min(best, duration)
+        return best, rendered
+
+    def _create_posts(self, count, tags_count) -> list[Post]:
+        author = User.objects.create_user(email=f"benchmark-{uuid4()}@example.com", first_name="John")
+        category = Category.objects.create(title=f"Benchmark {uuid4()}")
+        tags = [Tag.objects.create(label=f"benchmark-{i}") for i in range(tags_count)]
+        content_type = ContentType.objects.get_for_model(Post)
+
+        posts = [
+            Post.objects.create(title=f"Benchmark {i}", content="Lorem ipsum " * 20, category=category, author=author)
+            for i in range(count)
+        ]
+        TaggedItem.objects.bulk_create([
+            TaggedItem(tag=tag, content_type=content_type, object_id=post.pk)
+            for post in posts for tag in tags
+        ])
+        Counter.objects.bulk_create([
+            Counter(content_type=content_type, object_id=post.pk, likes=post.pk % 5, comments=post.pk % 3)
+            for post in posts
+        ])
+        return list(PostDefaultsMixin.queryset.filter(pk__in=[post.pk for post in posts]).defer('content'))
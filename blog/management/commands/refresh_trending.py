@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from blog.trending import refresh_scores
+
+
+class Command(BaseCommand):
+    help = "Refresh trending scores of posts that their counters changed since last run"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help="Refresh all posts")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        count = refresh_scores(full=options['full'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"{count} post scores refreshed"))
@@ -0,0 +1,22 @@
+# Generated by Django 3.2.9 on 2026-10-18 18:09
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0005_auto_20211127_2150'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostScore',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='score', serialize=False, to='blog.post')),
+                ('score', models.FloatField(db_index=True, verbose_name='Score')),
+                ('refreshed_at', models.DateTimeField(db_index=True, verbose_name='Refreshed at')),
+            ],
+        ),
+    ]
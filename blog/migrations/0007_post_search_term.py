@@ -0,0 +1,60 @@
+# Generated by Django 3.2.9 on 2026-10-18 18:37
+
+import re
+from collections import Counter
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+TITLE_WEIGHT = 5
+MIN_TERM_LENGTH = 2
+MAX_TERM_LENGTH = 40
+TOKEN_RE = re.compile(r'\w+')
+
+
+def tokenize(text):
+    return [
+        word.casefold()[:MAX_TERM_LENGTH] for word in TOKEN_RE.findall(text or '')
+        if len(word) >= MIN_TERM_LENGTH
+    ]
+
+
+def get_term_weights(title, content):
+    weights = Counter(tokenize(content))
+    for term, count in Counter(tokenize(title)).items():
+        weights[term] += count * TITLE_WEIGHT
+    return weights
+
+
+def index_posts(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    PostSearchTerm = apps.get_model('blog', 'PostSearchTerm')
+    for pk, title, content in Post.objects.order_by('pk').values_list('pk', 'title', 'content').iterator():
+        PostSearchTerm.objects.bulk_create([
+            PostSearchTerm(post_id=pk, term=term, weight=weight)
+            for term, weight in get_term_weights(title, content).items()
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_postscore'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=40, verbose_name='Term')),
+                ('weight', models.FloatField(verbose_name='Weight')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='blog.post')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='postsearchterm',
+            constraint=models.UniqueConstraint(fields=('term', 'post'), name='unique_post_search_term'),
+        ),
+        migrations.RunPython(index_posts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 3.2.9 on 2026-10-18 18:43
+
+from django.db import migrations, models
+
+EXCERPT_LENGTH = 50
+EXCERPT_SUFFIX = " ..."
+
+
+def make_excerpt(content):
+    content = content or ''
+    if len(content) > EXCERPT_LENGTH:
+        return f"{content[:EXCERPT_LENGTH]}{EXCERPT_SUFFIX}"
+    return content
+
+
+def set_excerpts(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    posts = [
+        Post(pk=pk, excerpt=make_excerpt(content))
+        for pk, content in Post.objects.values_list('pk', 'content').iterator()
+    ]
+    Post.objects.bulk_update(posts, ['excerpt'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_post_search_term'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.CharField(blank=True, default='', editable=False, help_text="Beginning of the content, so lists don't load whole content", max_length=54, verbose_name='Excerpt'),
+        ),
+        migrations.RunPython(set_excerpts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 3.2.9 on 2026-10-18 18:48
+
+from django.db import migrations, models
+from django.db.models import Case, Value, When
+
+# Ranks of `special_for` choices, `None` is ranked like VIP
+VISIBILITY_TIERS = {'N': 0, 'V': 1, None: 1, 'A': 2, 'S': 3}
+
+
+def set_visibility_tiers(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    for category_id, category_special_for in apps.get_model('blog', 'Category').objects.values_list('pk', 'special_for'):
+        category_tier = VISIBILITY_TIERS[category_special_for]
+        Post.objects.filter(category_id=category_id).update(visibility_tier=Case(
+            *[When(special_for=choice, then=Value(max(tier, category_tier)))
+              for choice, tier in VISIBILITY_TIERS.items() if choice is not None],
+            default=Value(max(VISIBILITY_TIERS[None], category_tier)),
+        ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_post_excerpt'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='visibility_tier',
+            field=models.PositiveSmallIntegerField(db_index=True, default=0, editable=False, help_text="Rank of the stricter `special_for` of post and it's category", verbose_name='Visibility tier'),
+        ),
+        migrations.RunPython(set_visibility_tiers, migrations.RunPython.noop),
+    ]
@@ -1,14 +1,21 @@
 from django_filters.rest_framework.backends import DjangoFilterBackend
-from django.db.models import Q
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db.models import Max, Q
 from rest_framework.generics import get_object_or_404
 from rest_framework.mixins import DestroyModelMixin, RetrieveModelMixin, UpdateModelMixin
 from rest_framework.parsers import MultiPartParser, JSONParser
+from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
-from blog.models import Category, Post, SpecialForChoices
+from blog import response_cache
+from blog.models import VISIBILITY_TIERS, Category, Post, SpecialForChoices
+from blog.response_cache import EMBEDDED_MODELS, VERSIONED_MODELS, get_response_cache_key, personalize_posts
 from blog.serializers import CategorySerializer, PostSerializer
 from core.permissions import IsAdmin, IsAuthor, IsOwnerOfItem, IsReadOnly
 from core.mixins import DeletePicMixin
+from core.versions import get_models_version, get_time_stamp
+from social.utils import get_thread_version
 
 
 class RUDWithFilterMixin:
@@ -26,6 +33,10 @@ class RUDWithFilterMixin:
 
 
 class SpecialMixin:
+    visibility_tier_field = None
+    """Field with rank of `VISIBILITY_TIERS`, that's filtered
+    instead of `get_special_for_fields` if it's set"""
+
     def get_special_for_fields(self):
         """Returns a list of fields that contains `SpecialForChoices`"""
         return ['special_for']
@@ -51,30 +62,85 @@ class SpecialMixin:
 
         return queryset
 
-    def get_queryset(self):
-        queryset = super().get_queryset()
+    def get_user_tier(self) -> SpecialForChoices:
+        """Highest `SpecialForChoices` that requesting user can see"""
         user = self.request.user
         if user.is_authenticated:
             if user.is_staff:
-                return queryset
+                return SpecialForChoices.STAFF
             elif user.is_author:
-                return self.filterby_special_for(queryset, status="NOT", choices=[SpecialForChoices.STAFF])
+                return SpecialForChoices.AUTHOR
             elif user.is_vip:
-                return self.filterby_special_for(
-                    queryset,
-                    status="NOT",
-                    choices=[SpecialForChoices.STAFF, SpecialForChoices.AUTHOR]
-                )
+                return SpecialForChoices.VIP
+        return SpecialForChoices.NORMAL
+
+    def get_etag_variant(self) -> str:
+        # Users of different tiers see different objects
+        return self.get_user_tier()
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        tier = self.get_user_tier()
+        if tier == SpecialForChoices.STAFF:
+            return queryset
+        elif self.visibility_tier_field:
+            return queryset.filter(**{f'{self.visibility_tier_field}__lte': VISIBILITY_TIERS[tier]})
+        elif tier == SpecialForChoices.AUTHOR:
+            return self.filterby_special_for(queryset, status="NOT", choices=[SpecialForChoices.STAFF])
+        elif tier == SpecialForChoices.VIP:
+            return self.filterby_special_for(
+                queryset,
+                status="NOT",
+                choices=[SpecialForChoices.STAFF, SpecialForChoices.AUTHOR]
+            )
 
         return self.filterby_special_for(queryset, choices=[SpecialForChoices.NORMAL])
 
 
+class TierCacheMixin:
+    """Caches list and retrieve responses of posts for each tier of `SpecialMixin`.
+
+    Users of a tier see the same posts, so they share cached responses
+    and only personalized fields are set on every response.
+    """
+
+    def _get_cached_response(self, get_response) -> Response:
+        ttl = response_cache.RESPONSE_CACHE_TTL
+        if not ttl:
+            return get_response()
+
+        cache_key = get_response_cache_key(self.request, self.get_user_tier())
+        if (data := cache.get(cache_key)) is None:
+            response = get_response()
+            if response.status_code == 200:
+                cache.set(cache_key, response.data, ttl)
+            return response
+
+        personalize_posts(data['results'] if 'results' in data else [data], self.request.user)
+        return Response(data)
+
+
+class TierCacheListMixin(TierCacheMixin):
+    def list(self, request, *args, **kwargs):
+        return self._get_cached_response(lambda: super(TierCacheListMixin, self).list(request, *args, **kwargs))
+
+
+class TierCacheRetrieveMixin(TierCacheMixin):
+    def retrieve(self, request, *args, **kwargs):
+        return self._get_cached_response(
+            lambda: super(TierCacheRetrieveMixin, self).retrieve(request, *args, **kwargs)
+        )
+
+
 class CategoryDefaultsMixin(SpecialMixin):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     parser_classes = [MultiPartParser, JSONParser]
     permission_classes = [IsReadOnly | IsAuthor | IsAdmin]
 
+    def get_version_stamps(self) -> list[str]:
+        return [get_models_version(Category)]
+
 
 class CategoryDetailMixin(CategoryDefaultsMixin,
                           RetrieveModelMixin, UpdateModelMixin,
@@ -84,10 +150,14 @@ class CategoryDetailMixin(CategoryDefaultsMixin,
 
 
 class PostDefaultsMixin(SpecialMixin):
-    queryset = Post.objects.select_related("category").prefetch_related("tags__tag", 'likes', 'author', 'comments__user')
+    queryset = Post.objects.select_related("category").prefetch_related("tags__tag", 'author', 'counters')
     serializer_class = PostSerializer
     parser_classes = [MultiPartParser, JSONParser]
     permission_classes = [IsReadOnly | IsAdmin | (IsAuthor & IsOwnerOfItem)]
+    visibility_tier_field = 'visibility_tier'
+
+    def get_version_stamps(self) -> list[str]:
+        return [get_models_version(*VERSIONED_MODELS)]
 
     def get_special_for_fields(self):
         return ['special_for', 'category__special_for']
@@ -97,4 +167,24 @@ class PostDetailMixin(PostDefaultsMixin,
                       RetrieveModelMixin, UpdateModelMixin,
                       DeletePicMixin, DestroyModelMixin,
                       GenericViewSet):
-    pass
+
+    def get_version_stamps(self) -> list[str]:
+        """Stamps of the post, it's counters and comments, so
+        changes of other posts don't change it's validators"""
+        row = (
+            self.filter_queryset(self.get_queryset()).prefetch_related(None).order_by()
+            .annotate(counter_updated_at=Max('counters__updated_at'))
+            .values_list('pk', 'updated_at', 'counter_updated_at').first()
+        )
+        if row is None:
+            return []
+
+        pk, updated_at, counter_updated_at = row
+        stamps = [
+            get_time_stamp(updated_at),
+            get_thread_version(ContentType.objects.get_for_model(Post), pk),
+            get_models_version(*EMBEDDED_MODELS),
+        ]
+        if counter_updated_at:
+            stamps.append(get_time_stamp(counter_updated_at))
+        return stamps
@@ -7,15 +7,17 @@ from django.utils.translation import gettext_lazy as _
 from django.utils.html import escape
 from django.db.models.fields import TextField
 from django.db.models.enums import TextChoices
-from django.db.models.fields.related import ForeignKey
+from django.db.models.fields.related import ForeignKey, OneToOneField
 from django.db.models.deletion import CASCADE, PROTECT
 from django.db.models.base import Model
 from django.core.mail import send_mail
 from django.conf import settings
 from django.db import models
+from django.db.models import Case, Value, When
 
-from social.models import Comment, Like, TaggedItem
+from social.models import Comment, Counter, Like, TaggedItem
 from picturic.fields import PictureField
+from .excerpts import EXCERPT_LENGTH, EXCERPT_SUFFIX, make_excerpt
 
 
 class UserManager(BaseUserManager):
@@ -103,6 +105,7 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     compliments = GenericRelation(to=Comment, on_delete=CASCADE)
     likes = GenericRelation(to=Like, on_delete=CASCADE)
+    counters = GenericRelation(to=Counter, on_delete=CASCADE)
 
     objects = UserManager()
 
@@ -148,6 +151,35 @@ class SpecialForChoices(TextChoices):
     NORMAL = 'N', _("Normal")
 
 
+VISIBILITY_TIERS = {
+    SpecialForChoices.NORMAL: 0,
+    SpecialForChoices.VIP: 1,
+    SpecialForChoices.AUTHOR: 2,
+    SpecialForChoices.STAFF: 3,
+}
+"""Ordered ranks of `SpecialForChoices`, users can see tiers up to their own"""
+
+
+def get_visibility_tier(*special_fors) -> int:
+    """Rank of the strictest choice.
+
+    `None` is ranked like VIP, because it's hidden from normal users only.
+    """
+    return max(
+        VISIBILITY_TIERS[SpecialForChoices.VIP] if special_for is None else VISIBILITY_TIERS[special_for]
+        for special_for in special_fors
+    )
+
+
+def update_category_visibility_tiers(post_model, category):
+    """Set `visibility_tier` of posts of a category in one query"""
+    post_model.objects.filter(category_id=category.pk).update(visibility_tier=Case(
+        *[When(special_for=choice, then=Value(get_visibility_tier(choice, category.special_for)))
+          for choice in SpecialForChoices.values],
+        default=Value(get_visibility_tier(None, category.special_for)),
+    ))
+
+
 class Category(Model):
     title = models.CharField(_("title"), max_length=40)
     slug = models.SlugField(
@@ -183,7 +215,18 @@ class Post(Model):
         help_text=_("This post will only available for special users"),
         null=True, default=SpecialForChoices.NORMAL,
         max_length=1, choices=SpecialForChoices.choices)
+    visibility_tier = models.PositiveSmallIntegerField(
+        _("Visibility tier"),
+        default=0, editable=False, db_index=True,
+        help_text=_("Rank of the stricter `special_for` of post and it's category"),
+    )
     content = TextField(_("Content"))
+    excerpt = models.CharField(
+        _("Excerpt"),
+        max_length=EXCERPT_LENGTH + len(EXCERPT_SUFFIX),
+        editable=False, blank=True, default='',
+        help_text=_("Beginning of the content, so lists don't load whole content"),
+    )
     picture = PictureField(
         verbose_name=_("Picture"),
         use_upload_to_func=True,
@@ -205,6 +248,7 @@ class Post(Model):
     comments = GenericRelation(to=Comment, on_delete=CASCADE)
     tags = GenericRelation(to=TaggedItem, on_delete=CASCADE)
     likes = GenericRelation(to=Like, on_delete=CASCADE, related_name="liked-posts")
+    counters = GenericRelation(to=Counter, on_delete=CASCADE)
 
     category = ForeignKey(
         to=Category, on_delete=PROTECT,
@@ -217,3 +261,43 @@ class Post(Model):
         verbose_name=_("Author"),
         related_name='posts',
     )
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        computed_fields = set()
+        if update_fields is None or 'content' in update_fields:
+            self.excerpt = make_excerpt(self.content)
+            computed_fields.add('excerpt')
+        if update_fields is None or {'special_for', 'category'} & set(update_fields):
+            self.visibility_tier = get_visibility_tier(self.special_for, self.category.special_for)
+            computed_fields.add('visibility_tier')
+
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, *computed_fields}
+        return super().save(*args, **kwargs)
+
+
+class PostScore(Model):
+    """Trending score of a post, refreshed by `refresh_trending` command"""
+    post = OneToOneField(
+        to=Post, on_delete=CASCADE,
+        primary_key=True,
+        related_name='score',
+    )
+    score = models.FloatField(_("Score"), db_index=True)
+    refreshed_at = models.DateTimeField(_("Refreshed at"), db_index=True)
+
+
+class PostSearchTerm(Model):
+    """A term of a post in the search index, kept up to date by signals"""
+    post = ForeignKey(
+        to=Post, on_delete=CASCADE,
+        related_name='search_terms',
+    )
+    term = models.CharField(_("Term"), max_length=40)
+    weight = models.FloatField(_("Weight"))
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['term', 'post'], name='unique_post_search_term'),
+        ]
@@ -0,0 +1,45 @@
+from hashlib import md5
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+
+from core.utils import get_sorted_query
+from core.versions import get_models_version
+from social.models import Comment, Like, Tag, TaggedItem
+from social.utils import get_user_likes_by_ids
+from viewcount.utils import get_view_counts_by_ids
+from .models import Category, Post, User
+
+RESPONSE_CACHE_TTL = getattr(settings, 'POST_RESPONSE_CACHE_TTL', 0)
+"""
+Seconds that post list and detail responses are cached for each
+visibility tier, `0` disables caching. use a shared cache backend
+if you run multiple processes.
+"""
+
+EMBEDDED_MODELS = [Category, TaggedItem, Tag, User]
+"""Models that posts embed rows of, like their authors and labels of their tags"""
+
+VERSIONED_MODELS = [Post, Like, Comment, *EMBEDDED_MODELS]
+"""Changing rows of these models invalidates all cached responses"""
+
+
+def get_response_cache_key(request, tier: str) -> str:
+    """Cache key of a response for users of `tier`,
+    query params are sorted so their order doesn't matter"""
+    url = f"{request.build_absolute_uri(request.path)}?{get_sorted_query(request)}"
+    return f"posts:{tier}:{get_models_version(*VERSIONED_MODELS)}:{md5(url.encode()).hexdigest()}"
+
+
+def personalize_posts(posts: list[dict], user):
+    """Set fields of serialized posts that aren't shared in cache,
+    `liked_by_user` of the user and live `view_count`"""
+    content_type = ContentType.objects.get_for_model(Post)
+    ids = [post['id'] for post in posts]
+    likes = get_user_likes_by_ids(content_type, ids, user)
+    view_counts = get_view_counts_by_ids(content_type, ids)
+
+    for post in posts:
+        like = likes.get(post['id'])
+        post['liked_by_user'] = like.status == Like.statuses.LIKE if like else None
+        post['view_count'] = view_counts.get(post['id'], 0)
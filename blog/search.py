@@ -0,0 +1,147 @@
+import math
+import re
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, Count, F, FloatField, OuterRef, Subquery, Sum, Value, When
+from django.utils.html import escape
+
+from .models import Post, PostSearchTerm
+
+SEARCH_TITLE_WEIGHT = getattr(settings, 'SEARCH_TITLE_WEIGHT', 5)
+"""Weight of a term in title against the same term in content"""
+
+SEARCH_SNIPPET_LENGTH = getattr(settings, 'SEARCH_SNIPPET_LENGTH', 160)
+"""Characters of content in highlighted snippets"""
+
+SEARCH_HIGHLIGHT_TAG = getattr(settings, 'SEARCH_HIGHLIGHT_TAG', 'mark')
+"""HTML tag that wraps matched terms in snippets"""
+
+MIN_TERM_LENGTH = 2
+MAX_TERM_LENGTH = PostSearchTerm._meta.get_field('term').max_length
+TOKEN_RE = re.compile(r'\w+')
+DOCUMENT_COUNT_KEY = 'search:document_count'
+
+
+def normalize_term(word: str) -> str:
+    return word.casefold()[:MAX_TERM_LENGTH]
+
+
+def tokenize(text: str) -> list[str]:
+    """Normalized terms of a text, in order of appearance"""
+    return [
+        normalize_term(word) for word in TOKEN_RE.findall(text or '')
+        if len(word) >= MIN_TERM_LENGTH
+    ]
+
+
+def get_term_weights(title: str, content: str) -> dict[str, float]:
+    weights = Counter(tokenize(content))
+    for term, count in Counter(tokenize(title)).items():
+        weights[term] += count * SEARCH_TITLE_WEIGHT
+    return weights
+
+
+def get_document_count() -> int:
+    """Number of posts for inverse document frequency, cached until posts are created or deleted"""
+    return cache.get_or_set(DOCUMENT_COUNT_KEY, Post.objects.count, timeout=None)
+
+
+def invalidate_document_count():
+    cache.delete(DOCUMENT_COUNT_KEY)
+
+
+def index_post(post: Post):
+    """Write changed terms of a post to the search index"""
+    weights = get_term_weights(post.title, post.content)
+
+    with transaction.atomic():
+        indexed = {term.term: term for term in PostSearchTerm.objects.filter(post_id=post.pk)}
+        PostSearchTerm.objects.filter(
+            pk__in=[term.pk for name, term in indexed.items() if name not in weights]
+        ).delete()
+
+        changed = []
+        for name, term in indexed.items():
+            if name in weights and term.weight != weights[name]:
+                term.weight = weights[name]
+                changed.append(term)
+        PostSearchTerm.objects.bulk_update(changed, fields=['weight'])
+
+        PostSearchTerm.objects.bulk_create([
+            PostSearchTerm(post_id=post.pk, term=name, weight=weight)
+            for name, weight in weights.items() if name not in indexed
+        ])
+
+
+def rebuild_index(batch_size: int = 1000) -> int:
+    """Index all posts again, returns number of indexed posts"""
+    PostSearchTerm.objects.all().delete()
+
+    count = 0
+    last_pk = 0
+    while True:
+        batch = list(
+            Post.objects.filter(pk__gt=last_pk).order_by('pk')
+            .values_list('pk', 'title', 'content')[:batch_size]
+        )
+        if not batch:
+            invalidate_document_count()
+            return count
+
+        PostSearchTerm.objects.bulk_create([
+            PostSearchTerm(post_id=pk, term=term, weight=weight)
+            for pk, title, content in batch
+            for term, weight in get_term_weights(title, content).items()
+        ], batch_size=batch_size)
+        count += len(batch)
+        last_pk = batch[-1][0]
+
+
+def search_posts(queryset, terms: list[str]):
+    """Posts of the queryset that contain all of the terms,
+    annotated with their relevance as `search_rank`.
+
+    Rank is sum of term weights in the post multiplied by inverse
+    document frequency of the terms, so rare terms count more.
+    """
+    terms = list(dict.fromkeys(terms))
+    postings = PostSearchTerm.objects.filter(term__in=terms)
+    doc_freqs = dict(postings.values_list('term').annotate(Count('pk')).order_by()) if terms else {}
+    if not terms or len(doc_freqs) < len(terms):
+        return queryset.none().annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    total = max(get_document_count(), 1)
+    rank = Sum(Case(
+        *[When(term=term, then=F('weight') * math.log(1 + total / doc_freq))
+          for term, doc_freq in doc_freqs.items()],
+        output_field=FloatField(),
+    ))
+    ranks = postings.filter(post_id=OuterRef('pk')).values('post_id').annotate(rank=rank).values('rank')
+    matched = postings.values('post_id').annotate(matched=Count('pk')).filter(matched=len(terms)).values('post_id')
+
+    return queryset.filter(pk__in=matched).annotate(search_rank=Subquery(ranks, output_field=FloatField()))
+
+
+def highlight(text: str, terms: list[str], length: int = None) -> str:
+    """Escaped snippet of text around first matched term, with matched terms wrapped in `SEARCH_HIGHLIGHT_TAG`"""
+    length = length or SEARCH_SNIPPET_LENGTH
+    terms = set(terms)
+    matches = [match for match in TOKEN_RE.finditer(text) if normalize_term(match.group()) in terms]
+
+    start = max(matches[0].start() - length // 4, 0) if matches else 0
+    end = min(start + length, len(text))
+
+    parts = ['... ' if start else '']
+    position = start
+    for match in matches:
+        if match.end() > end:
+            break
+        parts.append(escape(text[position:match.start()]))
+        parts.append(f'<{SEARCH_HIGHLIGHT_TAG}>{escape(match.group())}</{SEARCH_HIGHLIGHT_TAG}>')
+        position = match.end()
+    parts.append(escape(text[position:end]))
+    parts.append(' ...' if end < len(text) else '')
+    return ''.join(parts)
@@ -2,6 +2,7 @@ from rest_framework import serializers
 
 from picturic.serializer_fields import PictureField
 from .models import User
+from .search import highlight
 
 
 class UserInfoSerializer(serializers.ModelSerializer):
@@ -34,3 +35,21 @@ class UserSerializerMixin:
         user = getattr(instance, self.model_user_field)
         rep['author'] = UserInfoSerializer(user).data
         return rep
+
+
+class SearchResultSerializerMixin:
+    """Adds `search_rank` and `highlight` when `search_terms` is in the context"""
+
+    def get_search_result(self, instance) -> dict:
+        terms = self.context.get('search_terms')
+        if terms is None:
+            return {}
+        return {
+            'search_rank': getattr(instance, 'search_rank', None),
+            'highlight': highlight(instance.content, terms),
+        }
+
+    def to_representation(self, instance):
+        rep = super().to_representation(instance)
+        rep.update(self.get_search_result(instance))
+        return rep
@@ -5,13 +5,14 @@ from djoser.serializers import (
 from rest_framework import serializers
 from rest_framework.fields import SerializerMethodField
 from rest_framework.relations import PrimaryKeyRelatedField
-from core.serializers import DeleteOldPicSerializerMixin
+from core.serializers import CompiledListSerializer, DeleteOldPicSerializerMixin
 
 from picturic.serializer_fields import PictureField
 from social.models import Tag
 from social.serializer_mixins import CommentSerializerMixin, LikeSerializerMixin, TagSerializerMixin
+from social.serializers import TaggedItemSerializer
 from viewcount.serializer_mixins import ViewCountSerializerMixin
-from .serializer_mixins import UserSerializerMixin
+from .serializer_mixins import SearchResultSerializerMixin, UserInfoSerializer, UserSerializerMixin
 from .models import Category, User, Post
 
 
@@ -76,6 +77,9 @@ class UserSerializer(CommentSerializerMixin,
         return super().get_comments_count(instance)
 
     def get_posts_count(self, instance) -> int:
+        if hasattr(instance, 'posts_count'):
+            # Annotated by viewset
+            return instance.posts_count
         return instance.posts.count()
 
 
@@ -209,7 +213,24 @@ class PostSerializer(DeleteOldPicSerializerMixin,
         return rep
 
 
-class PostInfoSerializer(LikeSerializerMixin,
+class PostInfoListSerializer(CompiledListSerializer):
+    """Serializes post lists like `PostInfoSerializer` without a serializer per post"""
+
+    def get_nested_representations(self) -> dict:
+        represent_user = self.compile(UserInfoSerializer())
+        represent_tag = self.compile(TaggedItemSerializer())
+        user_field = self.child.model_user_field
+        return {
+            'author': lambda post: represent_user(getattr(post, user_field)),
+            'tags': lambda post: [represent_tag(tag) for tag in post.tags.all()],
+        }
+
+    def extend_representation(self, instance, representation: dict):
+        representation.update(self.child.get_search_result(instance))
+
+
+class PostInfoSerializer(SearchResultSerializerMixin,
+                         LikeSerializerMixin,
                          TagSerializerMixin,
                          CommentSerializerMixin,
                          UserSerializerMixin,
@@ -247,9 +268,7 @@ class PostInfoSerializer(LikeSerializerMixin,
             "updated_at",
         ]
         read_only_fields = fields
+        list_serializer_class = PostInfoListSerializer
 
     def get_content(self, instance: Post) -> str:
-        content = instance.content
-        if len(content) > 50:
-            return f"{content[:50]} ..."
-        return content
+        return instance.excerpt
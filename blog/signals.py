@@ -1,8 +1,11 @@
-from django.db.models.signals import pre_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.utils.text import slugify
 from django.dispatch import receiver
 
-from .models import Category, Post
+from core.versions import bump_model_version
+from .models import Category, Post, update_category_visibility_tiers
+from .response_cache import VERSIONED_MODELS
+from .search import index_post, invalidate_document_count
 
 
 def _create_slug_from_title(model, instance):
@@ -30,3 +33,31 @@ def create_slug_from_title_post(sender, *args, **kwargs):
     instance = kwargs['instance']
     if not instance.slug:
         _create_slug_from_title(Post, instance)
+
+
+@receiver(post_save, sender=Category)
+def update_post_visibility_tiers(sender, instance, created=False, **kwargs):
+    if not created:
+        update_category_visibility_tiers(Post, instance)
+
+
+@receiver(post_save, sender=Post)
+def index_post_terms(sender, instance, created=False, update_fields=None, **kwargs):
+    if created:
+        invalidate_document_count()
+    if update_fields is None or {'title', 'content'} & set(update_fields):
+        index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, **kwargs):
+    invalidate_document_count()
+
+
+def bump_cached_model_version(sender, **kwargs):
+    bump_model_version(sender)
+
+
+for model in VERSIONED_MODELS:
+    post_save.connect(bump_cached_model_version, sender=model, dispatch_uid=f'bump_version_{model.__name__}')
+    post_delete.connect(bump_cached_model_version, sender=model, dispatch_uid=f'bump_version_deleted_{model.__name__}')
@@ -1,15 +1,38 @@
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APIClient
 from django.utils.http import urlencode
 from django.utils.text import slugify
 from django.urls.base import reverse
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.test import TestCase
+from unittest.mock import Mock, patch
 from uuid import uuid4
 from PIL import Image
+from datetime import datetime
+from decimal import Decimal
 import tempfile
+import json
 import os
 
-from .models import Category, Post, User
+from core.paginations import OffsetOrKeysetPagination
+from core.renderers import StreamingJSONRenderer
+from viewcount.bloom import recent_views
+from viewcount.buffer import view_buffer
+from viewcount.models import View
+from social.counters import get_generic_kwargs
+from social.models import Comment, Counter, Like, Tag, TaggedItem
+from .management.commands.benchmark_post_serializers import GenericPostInfoSerializer
+from .mixins import PostDefaultsMixin
+from .models import Category, Post, PostSearchTerm, User
+from .serializers import PostInfoSerializer
+from .search import get_document_count
+from .trending import refresh_scores
+from .views import PostListViewSet
 
 
 def create_user(**kwargs):
@@ -237,11 +260,50 @@ class UserTest(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data['posts_count'], 1)
 
+    def test_user_list_streaming(self):
+        for _ in range(2):
+            create_user()
+        url = reverse("blog:users-list")
+
+        res = self.staffuser_client.get(url)
+        self.assertFalse(res.streaming)
+        self.assertEqual(len(res.data), 5)
+
+        with patch('blog.views.UserViewSet.stream_chunk_size', 2):
+            streamed = self.staffuser_client.get(url)
+        self.assertEqual(streamed.status_code, status.HTTP_200_OK)
+        self.assertTrue(streamed.streaming)
+        self.assertEqual(json.loads(b''.join(streamed.streaming_content)), json.loads(res.content))
+
+    def test_streaming_renderer(self):
+        data = {
+            'id': 1,
+            'text': "Salam \u2028 دنیا",
+            'created_at': datetime(2020, 1, 2, 3, 4, 5, 678901),
+            'price': Decimal('1.50'),
+            'items': [{'rank': 0.1}, None, True],
+            2: "key",
+        }
+        expected = JSONRenderer().render(data)
+        self.assertEqual(StreamingJSONRenderer().render(data), expected)
+        with patch('core.renderers.orjson', None):
+            self.assertEqual(StreamingJSONRenderer().render(data), expected)
+
+        for value in [1e-05, 1e20, -1.5e16, 1e-07, 0.0001]:
+            data = {'score': value, 'items': (value, Decimal(value)), value: "key"}
+            self.assertEqual(StreamingJSONRenderer().render(data), JSONRenderer().render(data))
+        for value in [float('nan'), float('inf')]:
+            with self.assertRaises(ValueError):
+                StreamingJSONRenderer().render({'items': [value]})
+
 
 class PostTest(TestCase):
     def _post_detail_url(self, pk):
         return f"{reverse('blog:post-detail')}?{urlencode({'id':pk})}"
 
+    def _post_detail_views_url(self, pk, **params):
+        return f"{reverse('blog:post-view-stats')}?{urlencode({'id':pk, **params})}"
+
     def _post_detail_like_url(self, pk):
         return f"{reverse('blog:post-like')}?{urlencode({'id':pk})}"
 
@@ -262,6 +324,8 @@ class PostTest(TestCase):
         self.user_client = APIClient()
         self.user_client.force_authenticate(self.user)
 
+        recent_views.clear()
+
     def test_create_by_author(self):
         res = self.author_client.post(
             self._post_create_url(),
@@ -341,10 +405,11 @@ class PostTest(TestCase):
         self.assertEqual(res.data['dislikes'], 1)
         self.assertEqual(res.data['liked_by_user'], False)
 
-    def _get_post(self, client, post, REMOTE_ADDR="127.0.0.1"):
+    def _get_post(self, client, post, REMOTE_ADDR="127.0.0.1", HTTP_USER_AGENT="Firefox"):
         res = client.get(
             self._post_detail_url(post.pk),
-            REMOTE_ADDR=REMOTE_ADDR
+            REMOTE_ADDR=REMOTE_ADDR,
+            HTTP_USER_AGENT=HTTP_USER_AGENT,
         )
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         return res
@@ -355,13 +420,149 @@ class PostTest(TestCase):
         guest_client = APIClient()
         self._get_post(guest_client, post, '192.1.1.4')  # 1
         self._get_post(guest_client, post, '192.1.1.4')  # 1
-        self._get_post(guest_client, post)  # 1
+        self._get_post(guest_client, post)  # 2
+        self._get_post(guest_client, post, HTTP_USER_AGENT='Chrome')  # 3
+
+        self._get_post(self.user_client, post)  # 4
+        self._get_post(self.user_client, post, '155.3.4.51')  # 4
+
+        res = self._get_post(self.staffuser_client, post)  # 5
+        self.assertEqual(res.data['view_count'], 5)
+
+    def test_recent_views_dedupe(self):
+        post = create_post()
+        self._get_post(self.user_client, post)
+        View.objects.all().delete()
+
+        # Second view is absorbed in memory
+        self._get_post(self.user_client, post)
+        self.assertEqual(View.objects.count(), 0)
+
+        with patch('viewcount.settings.DEDUPE', False):
+            self._get_post(self.user_client, post)
+        self.assertEqual(View.objects.count(), 1)
+
+    def test_list_view_count(self):
+        post = create_post()
+        self._get_post(self.user_client, post)
+        self._get_post(self.author_client, post)
+
+        uncounted_post = create_post()
+        View.objects.create(ip='127.0.0.1', **get_generic_kwargs(uncounted_post))
+
+        res = self.staffuser_client.get(self._post_create_url())
+        view_counts = {item['id']: item['view_count'] for item in res.data['results']}
+        self.assertEqual(view_counts, {post.pk: 2, uncounted_post.pk: 1})
+
+    def test_list_counts_without_counters(self):
+        posts = [create_post() for _ in range(5)]
+        Like.objects.create(user=self.user, status=Like.statuses.DISLIKE, **get_generic_kwargs(posts[0]))
+        Comment.objects.create(text="Lorem", user=self.user, **get_generic_kwargs(posts[1]))
+        Counter.objects.all().delete()
+
+        def count_queries(table, url):
+            with CaptureQueriesContext(connection) as queries:
+                res = self.staffuser_client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            return res, sum(f'FROM "{table}"' in query['sql'] for query in queries)
+
+        res, like_queries = count_queries('social_like', self._post_create_url())
+        self.assertLessEqual(like_queries, 2)
+        results = {item['id']: item for item in res.data['results']}
+        self.assertEqual(results[posts[0].pk]['dislikes'], 1)
+        self.assertEqual(results[posts[1].pk]['comments_count'], 1)
+
+        _, comment_queries = count_queries('social_comment', self._post_create_url())
+        self.assertEqual(comment_queries, 1)
+        _, like_queries = count_queries('social_like', reverse("blog:users-list"))
+        self.assertLessEqual(like_queries, 2)
+
+    def test_list_excerpt(self):
+        post = create_post(content="Lorem ipsum " * 100)
+        self.assertEqual(post.excerpt, f"{post.content[:50]} ...")
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.user_client.get(self._post_create_url())
+        self.assertEqual(res.data['results'][0]['content'], post.excerpt)
+        self.assertFalse(any('"blog_post"."content"' in query['sql'] for query in queries))
+
+        post.content = "Short"
+        post.save(update_fields=['content'])
+        self.assertEqual(Post.objects.get(pk=post.pk).excerpt, "Short")
+
+        Post.objects.update(excerpt='')
+        call_command('backfill_post_excerpts', stdout=open(os.devnull, 'w'))
+        self.assertEqual(Post.objects.get(pk=post.pk).excerpt, "Short")
+
+    def test_bulk_likes(self):
+        liked_post, disliked_post, unliked_post = create_post(), create_post(), create_post()
+        self.user_client.post(self._post_detail_like_url(disliked_post.pk), {'status': "L"})
+        self.user_client.post(self._post_detail_like_url(unliked_post.pk), {'status': "L"})
+
+        res = self.user_client.post(reverse('blog:post-bulk-like'), [
+            {"id": liked_post.pk, "status": "L"},
+            {"id": disliked_post.pk, "status": "DL"},
+            {"id": unliked_post.pk, "status": None},
+        ], format='json')
+        self.assertEqual(res.status_code, status.HTTP_200_OK, msg=res.data)
+
+        res = self.user_client.get(self._post_create_url())
+        posts = {item['id']: item for item in res.data['results']}
+        self.assertEqual(
+            {pk: (post['liked_by_user'], post['likes'], post['dislikes']) for pk, post in posts.items()},
+            {liked_post.pk: (True, 1, 0), disliked_post.pk: (False, 0, 1), unliked_post.pk: (None, 0, 0)},
+        )
+        self.assertEqual(Like.objects.filter(user=self.user).count(), 2)
+
+        res = self.user_client.post(reverse('blog:post-bulk-like'), [{"id": 0, "status": "L"}], format='json')
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
 
-        self._get_post(self.user_client, post)  # 2
-        self._get_post(self.user_client, post, '155.3.4.51')  # 2
+    def test_list_liked_by_user(self):
+        liked_post, disliked_post, other_post = create_post(), create_post(), create_post()
+        self.user_client.post(self._post_detail_like_url(liked_post.pk), {'status': "L"})
+        self.user_client.post(self._post_detail_like_url(disliked_post.pk), {'status': "DL"})
+        self.author_client.post(self._post_detail_like_url(other_post.pk), {'status': "L"})
 
-        res = self._get_post(self.staffuser_client, post)  # 3
+        res = self.user_client.get(self._post_create_url())
+        liked_by_user = {item['id']: item['liked_by_user'] for item in res.data['results']}
+        self.assertEqual(liked_by_user, {liked_post.pk: True, disliked_post.pk: False, other_post.pk: None})
+
+    @patch('viewcount.settings.BUFFERED', True)
+    @patch('viewcount.settings.DEDUPE', False)
+    def test_buffered_view_count(self):
+        post = create_post()
+
+        self._get_post(APIClient(), post)
+        self._get_post(self.user_client, post)
+        self._get_post(self.user_client, post)
+        self.assertEqual(View.objects.count(), 0)
+
+        self.assertEqual(len(view_buffer.flush()), 2)
+        self.assertEqual(len(view_buffer), 0)
+
+        self._get_post(self.user_client, post)
+        self._get_post(self.staffuser_client, post)
+        self.assertEqual(len(view_buffer.flush()), 1)  # user viewed before
+
+        res = self._get_post(self.author_client, post)
+        self.assertEqual(res.data['view_count'], 3)
+        view_buffer.drain()
+
+    @patch('viewcount.settings.SKETCHES', True)
+    def test_view_stats(self):
+        post = create_post()
+
+        self._get_post(APIClient(), post, '192.1.1.4')
+        self._get_post(APIClient(), post, '192.1.1.5')
+        self._get_post(self.user_client, post)
+        self._get_post(self.user_client, post)
+        view_buffer.flush()
+
+        res = self.user_client.get(self._post_detail_views_url(post.pk, days=7))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data['view_count'], 3)
+        self.assertEqual(res.data['unique_viewers'], 3)
+        self.assertEqual(res.data['days'], 7)
 
 
 class SpecialForTest(TestCase):
@@ -426,3 +627,383 @@ class SpecialForTest(TestCase):
             self._post_detail_url(post.pk)
         )
         self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_visibility_tier_matches_special_for(self):
+        category = create_category(special_for='V')
+        for special_for in [None, 'N', 'V', 'A', 'S']:
+            create_post(category=category, special_for=special_for)
+            create_post(special_for=special_for)
+
+        category.special_for = 'A'
+        category.save()
+        self.assertEqual(Post.objects.get(category=category, special_for='N').visibility_tier, 2)
+
+        view = PostListViewSet(action='retrieve')
+        for user in [self.staffuser, self.author, self.vip, self.user, AnonymousUser()]:
+            view.request = Mock(user=user)
+            with patch.object(PostListViewSet, 'visibility_tier_field', None):
+                expected_ids = set(view.get_queryset().values_list('pk', flat=True))
+            self.assertEqual(set(view.get_queryset().values_list('pk', flat=True)), expected_ids)
+
+
+class TrendingTest(TestCase):
+    def setUp(self) -> None:
+        self.user_client = APIClient()
+        self.user_client.force_authenticate(create_user())
+        self.trending_url = reverse('blog:post-trending')
+
+    def _set_counter(self, post, **counts):
+        Counter.objects.update_or_create(**get_generic_kwargs(post), defaults=counts)
+
+    def test_trending_order(self):
+        quiet_post = create_post()
+        hot_post = create_post()
+        vip_post = create_post(special_for='V')
+
+        self._set_counter(hot_post, likes=10)
+        self._set_counter(vip_post, likes=20)
+        self.assertEqual(refresh_scores(), 3)
+        create_post()  # Not refreshed yet
+
+        res = self.user_client.get(self.trending_url)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [post['id'] for post in res.data['results']],
+            [hot_post.pk, quiet_post.pk]
+        )
+
+        self.assertEqual(refresh_scores(), 1)
+        self.assertEqual(refresh_scores(), 0)
+        self._set_counter(quiet_post, comments=100)
+        self.assertEqual(refresh_scores(), 1)
+
+        res = self.user_client.get(self.trending_url)
+        self.assertEqual(res.data['results'][0]['id'], quiet_post.pk)
+
+
+class SearchTest(TestCase):
+    def setUp(self) -> None:
+        self.user_client = APIClient()
+        self.user_client.force_authenticate(create_user())
+        self.post_list_url = reverse('blog:post-list')
+
+    def _search(self, query, **params):
+        res = self.user_client.get(self.post_list_url, {"search": query, "search_mode": "fulltext", **params})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data['results']
+
+    def test_search_ranking(self):
+        content_post = create_post(title="Lorem", content="How to brew coffee at home")
+        title_post = create_post(title="Coffee brewing", content="Brew coffee with a <b>press</b>")
+        create_post(title="Tea", content="How to brew tea")
+        create_post(title="Coffee", content="Secret", special_for='V')
+
+        results = self._search("COFFEE brew")
+        self.assertEqual([post['id'] for post in results], [title_post.pk, content_post.pk])
+        self.assertGreater(results[0]['search_rank'], results[1]['search_rank'])
+        self.assertEqual(
+            results[0]['highlight'],
+            "<mark>Brew</mark> <mark>coffee</mark> with a &lt;b&gt;press&lt;/b&gt;"
+        )
+
+        self.assertEqual(self._search("coffe"), [])
+        self.assertEqual(len(self._search("")), 3)
+        self.assertEqual(len(self._search("a")), 3)
+        self.assertEqual(len(self._search("coffe", search_mode='contains')), 2)
+        self.assertNotIn('highlight', self._search("coffe", search_mode='contains')[0])
+
+        # Substring search stays the default
+        res = self.user_client.get(self.post_list_url, {"search": "coffe"})
+        self.assertEqual(len(res.data['results']), 2)
+        self.assertNotIn('search_rank', res.data['results'][0])
+
+        res = self.user_client.get(self.post_list_url, {"search": "coffee", "search_mode": "regex"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_index_updates(self):
+        post = create_post(title="Lorem", content="Espresso")
+        self.assertEqual(len(self._search("espresso")), 1)
+
+        post.content = "Latte"
+        post.save()
+        self.assertEqual(self._search("espresso"), [])
+        self.assertEqual(len(self._search("latte")), 1)
+
+        PostSearchTerm.objects.all().delete()
+        call_command('rebuild_search_index', stdout=open(os.devnull, 'w'))
+        self.assertEqual(len(self._search("latte")), 1)
+
+        post.delete()
+        self.assertFalse(PostSearchTerm.objects.exists())
+
+    def test_document_count(self):
+        cache.clear()
+        post = create_post()
+        self.assertEqual(get_document_count(), 1)
+
+        with self.assertNumQueries(0):
+            get_document_count()
+        create_post()
+        self.assertEqual(get_document_count(), 2)
+        post.delete()
+        self.assertEqual(get_document_count(), 1)
+
+
+class CursorPaginationTest(TestCase):
+    def setUp(self) -> None:
+        self.user_client = APIClient()
+        self.user_client.force_authenticate(create_user())
+        self.post_list_url = reverse('blog:post-list')
+
+        categories = [create_category(title=title) for title in ["B", "A"]]
+        for i, title in enumerate(["Lorem", "Ipsum", "Lorem", "Dolor", "Sit"]):
+            create_post(title=title, category=categories[i % 2], content=f"Coffee {'brew ' * i}")
+
+    def _get_all_pages(self, **params):
+        ids = []
+        res = self.user_client.get(self.post_list_url, {"pagination": "cursor", "page_size": 2, **params})
+        while True:
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            ids += [post['id'] for post in res.data['results']]
+            if not res.data['next']:
+                return ids, res
+            res = self.user_client.get(res.data['next'])
+
+    def test_cursor_pages_follow_ordering(self):
+        for ordering in ['title', '-created_at', 'category__title,-title', '-updated_at']:
+            fields = ordering.split(',')
+            # Ties are ordered by pk in direction of the last field
+            tie_breaker = '-pk' if fields[-1].startswith('-') else 'pk'
+            ids, last_res = self._get_all_pages(ordering=ordering)
+            expected_ids = list(Post.objects.order_by(*fields, tie_breaker).values_list('pk', flat=True))
+            self.assertEqual(ids, expected_ids, ordering)
+
+        previous_res = self.user_client.get(last_res.data['previous'])
+        self.assertEqual([post['id'] for post in previous_res.data['results']], ids[2:4])
+
+        ids, _ = self._get_all_pages(search="coffee brew")
+        self.assertEqual(ids, list(Post.objects.order_by('-pk').values_list('pk', flat=True)[:4]))
+
+        res = self.user_client.get(self.post_list_url, {"cursor": "invalid"})
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_paginated_response_schema(self):
+        schema = OffsetOrKeysetPagination().get_paginated_response_schema({'type': 'array'})
+        offset_schema, keyset_schema = schema['anyOf']
+        self.assertIn('count', offset_schema['properties'])
+        self.assertNotIn('count', keyset_schema['properties'])
+
+        res = self.user_client.get(self.post_list_url, {"pagination": "cursor"})
+        self.assertEqual(set(res.data), set(keyset_schema['properties']))
+
+
+@patch('blog.response_cache.RESPONSE_CACHE_TTL', 60)
+class ResponseCacheTest(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        recent_views.clear()
+        self.user = create_user()
+        self.user_client = APIClient()
+        self.user_client.force_authenticate(self.user)
+        self.vip_client = APIClient()
+        self.vip_client.force_authenticate(create_user(is_vip=True))
+        self.post_list_url = reverse('blog:post-list')
+
+        self.post = create_post()
+        create_post(special_for='V')
+
+    def _post_detail_url(self, pk):
+        return f"{reverse('blog:post-detail')}?{urlencode({'id': pk})}"
+
+    def test_cached_list(self):
+        res = self.user_client.get(self.post_list_url, {"limit": 5, "offset": 0})
+        self.assertEqual(res.data['count'], 1)
+
+        with CaptureQueriesContext(connection) as queries:
+            res = APIClient().get(self.post_list_url, {"offset": 0, "limit": 5})
+        self.assertEqual(res.data['count'], 1)
+        self.assertFalse(any('"blog_post"' in query['sql'] for query in queries))
+
+        self.assertEqual(self.vip_client.get(self.post_list_url).data['count'], 2)
+
+        # Personalized fields are set on cached responses
+        self.user_client.post(reverse('blog:post-bulk-like'), [{"id": self.post.pk, "status": "L"}], format='json')
+        res = self.user_client.get(self.post_list_url, {"limit": 5, "offset": 0})
+        self.assertTrue(res.data['results'][0]['liked_by_user'])
+        self.assertEqual(res.data['results'][0]['likes'], 1)
+        res = APIClient().get(self.post_list_url, {"limit": 5, "offset": 0})
+        self.assertIsNone(res.data['results'][0]['liked_by_user'])
+
+        self.user_client.get(self.post_list_url)
+        # Updates without signals don't invalidate
+        Post.objects.filter(pk=self.post.pk).update(title="Stale")
+        self.assertEqual(self.user_client.get(self.post_list_url).data['results'][0]['title'], "Lorem")
+        self.post.title = "Fresh"
+        self.post.save()
+        self.assertEqual(self.user_client.get(self.post_list_url).data['results'][0]['title'], "Fresh")
+
+    def test_cached_author_and_tags(self):
+        tag = Tag.objects.create(label="python")
+        TaggedItem.objects.create(tag=tag, content_object=self.post)
+        url = self._post_detail_url(self.post.pk)
+        for client_url in [self.post_list_url, url]:
+            self.user_client.get(client_url)
+
+        self.post.author.first_name = "Renamed"
+        self.post.author.save()
+        tag.label = "rust"
+        tag.save()
+
+        post = self.user_client.get(self.post_list_url).data['results'][0]
+        self.assertEqual(post['author']['first_name'], "Renamed")
+        self.assertEqual(post['tags'][0]['label'], "rust")
+        self.assertEqual(self.user_client.get(url).data['author']['first_name'], "Renamed")
+
+    def test_cached_detail(self):
+        url = self._post_detail_url(self.post.pk)
+        self.assertEqual(self.user_client.get(url).data['view_count'], 1)
+        res = APIClient().get(url)
+        self.assertEqual(res.data['view_count'], 2)
+        self.assertIsNone(res.data['liked_by_user'])
+
+
+class ConditionalGetTest(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        recent_views.clear()
+        self.user = create_user()
+        self.user_client = APIClient()
+        self.user_client.force_authenticate(self.user)
+        self.post = create_post()
+        self.post_list_url = reverse('blog:post-list')
+
+    def test_post_list_not_modified(self):
+        res = APIClient().get(self.post_list_url)
+        etag = res['ETag']
+        self.assertIn('Authorization', res['Vary'])
+        self.assertIn('public', res['Cache-Control'])
+        self.assertIn('no-cache', res['Cache-Control'])
+
+        with self.assertNumQueries(0):
+            res = APIClient().get(self.post_list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res['ETag'], etag)
+
+        res = APIClient().get(self.post_list_url, HTTP_IF_MODIFIED_SINCE=res['Last-Modified'])
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        res = self.user_client.get(self.post_list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn('private', res['Cache-Control'])
+
+        self.post.title = "Changed"
+        self.post.save()
+        res = APIClient().get(self.post_list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_embedded_changes_modify_list(self):
+        tag = Tag.objects.create(label="python")
+        TaggedItem.objects.create(tag=tag, content_object=self.post)
+        etag = APIClient().get(self.post_list_url)['ETag']
+
+        self.post.author.first_name = "Renamed"
+        self.post.author.save()
+        res = APIClient().get(self.post_list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        tag.label = "rust"
+        tag.save()
+        res = APIClient().get(self.post_list_url, HTTP_IF_NONE_MATCH=res['ETag'])
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['results'][0]['tags'][0]['label'], "rust")
+
+    def test_post_detail_not_modified(self):
+        url = f"{reverse('blog:post-detail')}?{urlencode({'id': self.post.pk})}"
+        other_post = create_post()
+        etag = self.user_client.get(url)['ETag']
+        self.assertEqual(self.user_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # Likes and comments of other posts don't change validators of the post
+        self.user_client.post(reverse('blog:post-bulk-like'), [{"id": other_post.pk, "status": "L"}], format='json')
+        Comment.objects.create(text="Lorem", user=self.user, **get_generic_kwargs(other_post))
+        self.assertEqual(self.user_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.user_client.post(reverse('blog:post-bulk-like'), [{"id": self.post.pk, "status": "L"}], format='json')
+        res = self.user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['likes'], 1)
+
+        self.post.author.first_name = "Renamed"
+        self.post.author.save()
+        self.assertEqual(self.user_client.get(url, HTTP_IF_NONE_MATCH=res['ETag']).status_code, status.HTTP_200_OK)
+
+    def test_comments_not_modified(self):
+        comments_url = reverse('blog:post-comment-list')
+        res = self.user_client.get(comments_url, {"id": self.post.pk})
+        etag = res['ETag']
+
+        res = self.user_client.get(comments_url, {"id": self.post.pk}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.user_client.post(f"{comments_url}?id={self.post.pk}", {"text": "Hellow"})
+        res = self.user_client.get(comments_url, {"id": self.post.pk}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['results']), 1)
+
+
+class TagFilterTest(TestCase):
+    def setUp(self) -> None:
+        self.user_client = APIClient()
+        self.user_client.force_authenticate(create_user())
+        self.post_list_url = reverse('blog:post-list')
+
+        self.python, self.django, self.rust = [Tag.objects.create(label=label) for label in ["python", "django", "rust"]]
+        self.both_post = self._create_tagged_post(self.python, self.django)
+        self.python_post = self._create_tagged_post(self.python)
+        self.rust_post = self._create_tagged_post(self.rust)
+
+    def _create_tagged_post(self, *tags):
+        post = create_post()
+        for tag in tags:
+            TaggedItem.objects.create(tag=tag, content_object=post)
+        return post
+
+    def _get_ids(self, **params):
+        res = self.user_client.get(self.post_list_url, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return {post['id'] for post in res.data['results']}
+
+    def test_tag_filters(self):
+        self.assertEqual(self._get_ids(tag=self.python.pk), {self.both_post.pk, self.python_post.pk})
+
+        tag_ids = f"{self.django.pk},{self.rust.pk}"
+        self.assertEqual(self._get_ids(tag__in=tag_ids), {self.both_post.pk, self.rust_post.pk})
+        self.assertEqual(self._get_ids(tag__in=tag_ids, tag_mode='all'), set())
+        self.assertEqual(
+            self._get_ids(tag__in=f"{self.python.pk},{self.django.pk}", tag_mode='all'),
+            {self.both_post.pk}
+        )
+
+        self.assertEqual(self._get_ids(tag_label="python,django", tag_mode='all'), {self.both_post.pk})
+        self.assertEqual(self._get_ids(tag_label="rust"), {self.rust_post.pk})
+
+
+class PostInfoSerializerTest(TestCase):
+    def test_compiled_list_serializer(self):
+        tag = Tag.objects.create(label="python")
+        post = create_post(title="Coffee", content="Brew coffee")
+        create_post(special_for='V')
+        TaggedItem.objects.create(tag=tag, content_object=post)
+        Counter.objects.create(**get_generic_kwargs(post), likes=2, comments=1)
+        Like.objects.create(user=post.author, status=Like.statuses.LIKE, **get_generic_kwargs(post))
+
+        posts = list(PostDefaultsMixin.queryset.order_by('pk'))
+        request = Mock(user=post.author, build_absolute_uri=lambda url: f"http://testserver{url}")
+        for extra_context in [{}, {'search_terms': ['coffee']}]:
+            context = {'request': request, 'view_counts': {post.pk: 3}, **extra_context}
+            self.assertEqual(
+                PostInfoSerializer(posts, many=True, context=context).data,
+                GenericPostInfoSerializer(posts, many=True, context=context).data,
+            )
+
+        call_command('benchmark_post_serializers', page_size=5, repeat=1, stdout=open(os.devnull, 'w'))
@@ -0,0 +1,96 @@
+import math
+from datetime import datetime
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Max, Q, Sum
+from django.utils import timezone
+
+from social.models import Counter
+from .models import Post, PostScore
+
+TRENDING_WEIGHTS = getattr(settings, 'TRENDING_WEIGHTS', {
+    'views': 1,
+    'likes': 5,
+    'comments': 10,
+})
+"""Weight of every counter in engagement of a post"""
+
+TRENDING_DECAY = getattr(settings, 'TRENDING_DECAY', 45000)
+"""
+Every `TRENDING_DECAY` seconds, a post needs 10 times more
+engagement to keep it's rank against newer posts.
+"""
+
+EPOCH = datetime(2021, 1, 1, tzinfo=timezone.utc)
+
+
+def calculate_score(created_at: datetime, **counts) -> float:
+    """Score is log of engagement plus post age bonus.
+
+    Because the age bonus grows with creation time instead of
+    decaying with now, scores of posts without new engagement
+    never need to be recalculated.
+    """
+    engagement = sum(
+        counts.get(field, 0) * weight
+        for field, weight in TRENDING_WEIGHTS.items()
+    )
+    order = math.log10(max(engagement, 1))
+    return order + (created_at - EPOCH).total_seconds() / TRENDING_DECAY
+
+
+def refresh_scores(full: bool = False, batch_size: int = 1000) -> int:
+    """Calculate scores of posts that their counters changed
+    since last refresh, or all posts if `full` is `True`.
+
+    Returns number of refreshed posts.
+    """
+    refreshed_at = timezone.now()
+    posts = Post.objects.all()
+
+    last_refresh = PostScore.objects.aggregate(last=Max('refreshed_at'))['last']
+    if last_refresh and not full:
+        changed_ids = Counter.objects.filter(
+            content_type=ContentType.objects.get_for_model(Post),
+            updated_at__gte=last_refresh,
+        ).values('object_id')
+        posts = posts.filter(Q(pk__in=changed_ids) | Q(score__isnull=True))
+
+    post_ids = list(posts.values_list('pk', flat=True))
+    for i in range(0, len(post_ids), batch_size):
+        _refresh_batch(post_ids[i:i + batch_size], refreshed_at)
+
+    return len(post_ids)
+
+
+def _refresh_batch(post_ids: list[int], refreshed_at: datetime):
+    fields = ['views', 'likes', 'comments']
+    counters = {
+        object_id: dict(zip(fields, counts))
+        for object_id, *counts in Counter.objects.filter(
+            content_type=ContentType.objects.get_for_model(Post),
+            object_id__in=post_ids,
+        ).values_list('object_id').annotate(
+            *[Sum(field) for field in fields]
+        ).order_by()
+    }
+
+    scores = [
+        PostScore(
+            post_id=pk, refreshed_at=refreshed_at,
+            score=calculate_score(created_at, **counters.get(pk, {})),
+        )
+        for pk, created_at in Post.objects.filter(pk__in=post_ids).values_list('pk', 'created_at')
+    ]
+
+    with transaction.atomic():
+        existing_ids = set(PostScore.objects.filter(post_id__in=post_ids).values_list('post_id', flat=True))
+        PostScore.objects.bulk_update(
+            [score for score in scores if score.post_id in existing_ids],
+            fields=['score', 'refreshed_at'],
+        )
+        PostScore.objects.bulk_create(
+            [score for score in scores if score.post_id not in existing_ids]
+        )
@@ -3,6 +3,7 @@ from drf_spectacular.utils import OpenApiParameter, extend_schema, extend_schema
 from django.contrib.contenttypes.models import ContentType
 from djoser.views import UserViewSet as DjoserUserViewSet
 from django.contrib.auth import get_user_model
+from django.db.models import Count
 from rest_framework.mixins import CreateModelMixin, ListModelMixin
 from rest_framework.exceptions import ValidationError
 from rest_framework.generics import get_object_or_404
@@ -11,23 +12,23 @@ from rest_framework.viewsets import GenericViewSet
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.filters import SearchFilter
 
-from core.paginations import DefaultLimitOffsetPagination
+from core.paginations import OffsetOrKeysetPagination
 from core.permissions import IsAdmin, IsOwnerOfItem
 from core.filters import OrderingFilterWithSchema
+from core.mixins import ConditionalListMixin, ConditionalRetrieveMixin, StreamingListMixin
 from core.utils import all_methods
 from social.views import ListCreateCommentsViewset
-from social.mixins import LikeMixin
-from viewcount.mixins import ViewCountMixin
+from social.mixins import BulkLikeMixin, CounterListMixin, LikeListMixin, LikeMixin
+from viewcount.mixins import ViewCountListMixin, ViewCountMixin
 from .models import Post
-from .filters import CategoryRUDFilter, PostRUDFilter, PostFilter
+from .filters import CategoryRUDFilter, PostRUDFilter, PostFilter, PostSearchFilter
 from .schemas import (POST_RESPONSE_PAGINATED, POST_RESPONSE_RETRIEVE,
                       USER_EDIT_REQUEST, USER_STAFF_EDIT_REQUEST,
                       USER_SUPER_EDIT_REQUEST, rud_parameters)
 from .mixins import (CategoryDefaultsMixin, CategoryDetailMixin,
                      PostDefaultsMixin, PostDetailMixin,
-                     RUDWithFilterMixin)
+                     RUDWithFilterMixin, TierCacheListMixin, TierCacheRetrieveMixin)
 from .serializers import (PostInfoSerializer, UserSerializer,
                           UserProfileSerializer,
                           UserStaffEditSerializer, UserSuperEditSerializer)
@@ -44,12 +45,12 @@ from .serializers import (PostInfoSerializer, UserSerializer,
         examples=[USER_EDIT_REQUEST, USER_STAFF_EDIT_REQUEST, USER_SUPER_EDIT_REQUEST]
     ),
 )
-class UserViewSet(LikeMixin, DjoserUserViewSet):
+class UserViewSet(StreamingListMixin, CounterListMixin, LikeListMixin, BulkLikeMixin, LikeMixin, DjoserUserViewSet):
     def get_queryset(self):
         queryset = super().get_queryset()
         if self.request.method == "GET" and self.action != 'like':
-            queryset = queryset.prefetch_related('compliments__user', 'posts')
-        queryset = queryset.prefetch_related("likes")
+            queryset = queryset.annotate(posts_count=Count('posts'))
+        queryset = queryset.prefetch_related("counters")
 
         return queryset
 
@@ -112,14 +113,14 @@ class UserComplimentViewSet(ListCreateCommentsViewset):
         return super().create(request, *args, **kwargs)
 
 
-class CategoryListViewSet(CategoryDefaultsMixin,
+class CategoryListViewSet(ConditionalListMixin, CategoryDefaultsMixin,
                           ListModelMixin, CreateModelMixin,
                           GenericViewSet):
     pass
 
 
 @extend_schema(parameters=[rud_parameters])
-class CategoryDetailViewSet(RUDWithFilterMixin, CategoryDetailMixin):
+class CategoryDetailViewSet(RUDWithFilterMixin, ConditionalRetrieveMixin, CategoryDetailMixin):
     filterset_class = CategoryRUDFilter
 
 
@@ -127,23 +128,52 @@ class CategoryDetailViewSet(RUDWithFilterMixin, CategoryDetailMixin):
     list=extend_schema(examples=[POST_RESPONSE_PAGINATED]),
     create=extend_schema(examples=[POST_RESPONSE_RETRIEVE])
 )
-class PostListViewSet(PostDefaultsMixin,
+class PostListViewSet(ConditionalListMixin, TierCacheListMixin, ViewCountListMixin, CounterListMixin, LikeListMixin,
+                      BulkLikeMixin, PostDefaultsMixin,
                       ListModelMixin, CreateModelMixin,
                       GenericViewSet):
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilterWithSchema]
+    filter_backends = [DjangoFilterBackend, PostSearchFilter, OrderingFilterWithSchema]
     filterset_class = PostFilter
-    pagination_class = DefaultLimitOffsetPagination
+    pagination_class = OffsetOrKeysetPagination
     search_fields = ['title', 'content']
     ordering_fields = ['title', 'updated_at', 'created_at', 'category__title']
 
     def get_serializer_class(self):
-        if self.action == 'list':
+        if self.action in ['list', 'trending']:
             return PostInfoSerializer
         return super().get_serializer_class()
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ['list', 'trending'] and PostSearchFilter().get_index_terms(self.request) is None:
+            # Lists show stored excerpts, only highlights of search results need content
+            queryset = queryset.defer('content')
+        return queryset
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action in ['list', 'trending']:
+            terms = PostSearchFilter().get_index_terms(self.request)
+            if terms is not None:
+                context['search_terms'] = terms
+        return context
+
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
 
+    @extend_schema(examples=[POST_RESPONSE_PAGINATED])
+    @action(detail=False, methods=all_methods('get', only_these=True))
+    def trending(self, request, *args, **kwargs):
+        """Posts ordered by their trending score, which
+        is refreshed periodically by `refresh_trending` command"""
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            score__isnull=False
+        ).order_by('-score__score', '-pk')
+
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
 
 @extend_schema(parameters=[rud_parameters,
                            OpenApiParameter('id', exclude=True),
@@ -155,7 +185,8 @@ class PostListViewSet(PostDefaultsMixin,
     update=extend_schema(examples=[POST_RESPONSE_RETRIEVE]),
     partial_update=extend_schema(examples=[POST_RESPONSE_RETRIEVE]),
 )
-class PostDetailViewSet(RUDWithFilterMixin, ViewCountMixin, LikeMixin, PostDetailMixin):
+class PostDetailViewSet(RUDWithFilterMixin, ViewCountMixin, ConditionalRetrieveMixin, TierCacheRetrieveMixin,
+                        LikeMixin, PostDetailMixin):
     filterset_class = PostRUDFilter
 
 
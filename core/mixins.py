@@ -1,5 +1,141 @@
+from hashlib import md5
+from itertools import chain
+
+from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.response import Response
+
+from core.renderers import StreamedList, StreamingJSONRenderer
+from core.utils import get_sorted_query
+from core.versions import get_stamp_time
+
 
 class DeletePicMixin:
     def perform_destroy(self, instance):
         instance.picture.delete()
         super().perform_destroy(instance)
+
+
+class ConditionalGetMixin:
+    """Answers `If-None-Match` and `If-Modified-Since` with `304 Not Modified`
+    before the queryset is read and serialized.
+
+    You should set `get_version_stamps`, that returns version stamps of
+    everything the response contains, in your subclasses. `get_etag_variant`
+    can return a part of ETag for responses that differ between users on the same url.
+
+    ETag is derived from the stamps, the url and the user, and
+    Last-Modified from bump time of the stamps. Responses vary by
+    `Authorization` and clients have to revalidate them.
+    """
+
+    def get_etag(self, stamps: list[str]) -> str:
+        user = self.request.user
+        get_variant = getattr(self, 'get_etag_variant', None)
+        key = ":".join([
+            *stamps, get_variant() if get_variant else '',
+            str(user.pk) if user.is_authenticated else '',
+            self.request.path, get_sorted_query(self.request),
+        ])
+        return f'W/"{md5(key.encode()).hexdigest()}"'
+
+    def _get_conditional_response(self, get_response):
+        stamps = self.get_version_stamps()
+        if not stamps:
+            return get_response()
+
+        etag = self.get_etag(stamps)
+        last_modified = get_stamp_time(*stamps)
+        last_modified = last_modified and int(last_modified.timestamp())
+
+        response = get_conditional_response(self.request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = get_response()
+            if response.status_code != 200:
+                return response
+
+        response['ETag'] = etag
+        if last_modified:
+            response['Last-Modified'] = http_date(last_modified)
+        patch_vary_headers(response, ['Authorization'])
+        if self.request.user.is_authenticated:
+            patch_cache_control(response, private=True, no_cache=True)
+        else:
+            patch_cache_control(response, public=True, no_cache=True)
+        return response
+
+
+class ConditionalListMixin(ConditionalGetMixin):
+    def list(self, request, *args, **kwargs):
+        return self._get_conditional_response(
+            lambda: super(ConditionalListMixin, self).list(request, *args, **kwargs)
+        )
+
+
+class ConditionalRetrieveMixin(ConditionalGetMixin):
+    def retrieve(self, request, *args, **kwargs):
+        return self._get_conditional_response(
+            lambda: super(ConditionalRetrieveMixin, self).retrieve(request, *args, **kwargs)
+        )
+
+
+class StreamingResponseMixin:
+    """Streams JSON of big list responses while objects are serialized
+    in chunks of `stream_chunk_size`, so memory doesn't grow with the response.
+
+    Querysets are loaded chunk by chunk from a list of their ids.
+    Lists of one chunk and other formats, like the browsable API,
+    get a regular response.
+    """
+    stream_chunk_size = 100
+    renderer_classes = [StreamingJSONRenderer, BrowsableAPIRenderer]
+
+    def iter_chunks(self, objects):
+        size = self.stream_chunk_size
+        if isinstance(objects, QuerySet):
+            ids = list(objects.values_list('pk', flat=True))
+            for start in range(0, len(ids), size):
+                chunk_ids = ids[start:start + size]
+                loaded = objects.in_bulk(chunk_ids)
+                yield [loaded[pk] for pk in chunk_ids if pk in loaded]
+        else:
+            objects = list(objects)
+            for start in range(0, len(objects), size):
+                yield objects[start:start + size]
+
+    def get_streaming_list_response(self, queryset, **serializer_kwargs):
+        """Paginated list response of `queryset`, `serializer_kwargs` are passed to `get_serializer`"""
+        page = self.paginate_queryset(queryset)
+        objects = queryset if page is None else page
+
+        def get_response(data):
+            return Response(data) if page is None else self.get_paginated_response(data)
+
+        renderer = getattr(self.request, 'accepted_renderer', None)
+        if not isinstance(renderer, StreamingJSONRenderer):
+            return get_response(self.get_serializer(objects, many=True, **serializer_kwargs).data)
+
+        chunks = self.iter_chunks(objects)
+        first = next(chunks, [])
+        second = next(chunks, None)
+        if second is None:
+            return get_response(self.get_serializer(first, many=True, **serializer_kwargs).data)
+
+        results = StreamedList(
+            self.get_serializer(chunk, many=True, **serializer_kwargs).data
+            for chunk in chain([first, second], chunks)
+        )
+        response = get_response(results)
+        return StreamingHttpResponse(
+            renderer.iter_render(response.data),
+            status=response.status_code,
+            content_type=self.request.accepted_media_type,
+        )
+
+
+class StreamingListMixin(StreamingResponseMixin):
+    def list(self, request, *args, **kwargs):
+        return self.get_streaming_list_response(self.filter_queryset(self.get_queryset()))
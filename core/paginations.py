@@ -1,4 +1,11 @@
-from rest_framework.pagination import LimitOffsetPagination, PageNumberPagination
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, LimitOffsetPagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 
 class DefaultLimitOffsetPagination(LimitOffsetPagination):
@@ -7,3 +14,239 @@ class DefaultLimitOffsetPagination(LimitOffsetPagination):
 
 class DefaultPageNumberPagination(PageNumberPagination):
     page_size = 10
+
+
+class KeysetPagination(BasePagination):
+    """Cursor pagination on ordering of the queryset with pk as tie-breaker.
+
+    Pages are fetched with a `WHERE (fields, pk) < (values, pk)` condition
+    instead of an offset, so every page costs the same on large tables.
+    Ordered fields can be related fields or annotations but shouldn't be null.
+    """
+    ordering = '-created_at'
+    use_queryset_ordering = False
+    """Use ordering of the queryset, like the one set by `OrderingFilter`, and `ordering` if it's not ordered"""
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        page_size = self.get_page_size(request)
+
+        self.fields = self.get_ordering(queryset)
+        model_fields = [self._get_model_field(queryset, field) for field in self.fields]
+        cursor = self.decode_cursor(request, model_fields)
+        reverse = bool(cursor and cursor['reverse'])
+
+        queryset = queryset.order_by(*[
+            field if self._is_descending(field, reverse) else field.lstrip('-')
+            for field in self._get_directed_fields(reverse)
+        ])
+        if cursor:
+            queryset = queryset.filter(self._get_cursor_filter(cursor['values'], reverse))
+
+        page = list(queryset[:page_size + 1])
+        has_more = len(page) > page_size
+        page = page[:page_size]
+        if reverse:
+            page.reverse()
+
+        self.page = page
+        self.has_next = bool(cursor) if reverse else has_more
+        self.has_previous = has_more if reverse else bool(cursor)
+        return page
+
+    def get_ordering(self, queryset=None) -> list[str]:
+        """Ordered fields without the pk tie-breaker"""
+        ordering = []
+        if self.use_queryset_ordering and queryset is not None:
+            ordering = list(queryset.query.order_by)
+        if not ordering or not all(isinstance(field, str) for field in ordering):
+            ordering = [self.ordering] if isinstance(self.ordering, str) else list(self.ordering)
+        return [field for field in ordering if field.lstrip('-') not in ['pk', 'id']]
+
+    def _get_directed_fields(self, reverse: bool) -> list[str]:
+        """Ordered fields with pk, that follows direction of the last field"""
+        last = self.fields[-1] if self.fields else ''
+        return self.fields + ['-pk' if last.startswith('-') else 'pk']
+
+    def _is_descending(self, field: str, reverse: bool) -> bool:
+        return field.startswith('-') != reverse
+
+    def _get_model_field(self, queryset, field: str):
+        name = field.lstrip('-')
+        if name in queryset.query.annotations:
+            return queryset.query.annotations[name].output_field
+
+        opts = queryset.model._meta
+        for part in name.split('__'):
+            model_field = opts.get_field(part)
+            if model_field.is_relation:
+                opts = model_field.related_model._meta
+        return model_field
+
+    def _get_value(self, instance, field: str):
+        value = instance
+        for part in field.lstrip('-').split('__'):
+            value = getattr(value, part)
+        return value
+
+    def _get_cursor_filter(self, values: list, reverse: bool) -> Q:
+        """`(a, b) < (x, y)` as `a < x OR (a = x AND b < y)`"""
+        condition = Q(pk__in=[])
+        equal = Q()
+        for field, value in zip(self._get_directed_fields(reverse), values):
+            name = field.lstrip('-')
+            lookup = 'lt' if self._is_descending(field, reverse) else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def get_page_size(self, request) -> int:
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    def decode_cursor(self, request, model_fields: list) -> dict:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            cursor = json.loads(urlsafe_b64decode(encoded.encode()))
+            values = cursor['values']
+            if len(values) != len(model_fields) + 1:
+                raise ValueError("Cursor is for another ordering")
+            return {
+                "values": [field.to_python(value) for field, value in zip(model_fields, values)] + [int(values[-1])],
+                "reverse": bool(cursor['reverse']),
+            }
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, instance, reverse: bool, base_url: str = None) -> str:
+        """Link to the page after `instance`, on `base_url` or the current page url"""
+        fields = getattr(self, 'fields', None)
+        if fields is None:
+            fields = self.get_ordering()
+
+        values = [self._get_value(instance, field) for field in fields]
+        cursor = json.dumps({
+            "values": [value.isoformat() if hasattr(value, 'isoformat') else value for value in values] + [instance.pk],
+            "reverse": reverse,
+        }, default=str)
+        return replace_query_param(
+            base_url or self.base_url, self.cursor_query_param,
+            urlsafe_b64encode(cursor.encode()).decode()
+        )
+
+    def get_next_link(self) -> str:
+        if not self.has_next:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self) -> str:
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'previous': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'The pagination cursor value.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Number of results to return per page.',
+                'schema': {'type': 'integer'},
+            },
+        ]
+
+
+class OrderedKeysetPagination(KeysetPagination):
+    """Keyset pagination on ordering of the queryset"""
+    use_queryset_ordering = True
+
+
+class OffsetOrKeysetPagination(BasePagination):
+    """Limit offset pagination, or keyset pagination if `pagination=cursor` or a cursor is requested.
+
+    Keyset pages follow ordering of the queryset, so clients that page deep,
+    like crawlers, can switch to it without changing other params.
+    """
+    pagination_query_param = 'pagination'
+    offset_pagination_class = DefaultLimitOffsetPagination
+    keyset_pagination_class = OrderedKeysetPagination
+
+    def __init__(self):
+        self.offset_paginator = self.offset_pagination_class()
+        self.keyset_paginator = self.keyset_pagination_class()
+        self.paginator = self.offset_paginator
+
+    def is_keyset(self, request) -> bool:
+        return (
+            request.query_params.get(self.pagination_query_param) == 'cursor'
+            or self.keyset_paginator.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.paginator = self.keyset_paginator if self.is_keyset(request) else self.offset_paginator
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        """Either page shape, keyset pages don't have `count`"""
+        return {
+            'anyOf': [
+                self.offset_paginator.get_paginated_response_schema(schema),
+                self.keyset_paginator.get_paginated_response_schema(schema),
+            ],
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.pagination_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Use `cursor` for keyset pages that cost the same at any depth.',
+                'schema': {'type': 'string', 'enum': ['offset', 'cursor']},
+            },
+            *self.offset_paginator.get_schema_operation_parameters(view),
+            *self.keyset_paginator.get_schema_operation_parameters(view),
+        ]
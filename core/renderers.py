@@ -0,0 +1,82 @@
+from decimal import Decimal
+
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class StreamedList:
+    """Items of a JSON array that are produced chunk by chunk while it's rendered"""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def __iter__(self):
+        return iter(self.chunks)
+
+
+def _floats_match(data) -> bool:
+    """Whether `orjson` writes all floats of data the same as `json`.
+
+    `orjson` doesn't use exponents for small floats, writes large ones without `+`
+    and NaN or infinity as `null`, where `JSONRenderer` raises `ValueError`.
+    """
+    if isinstance(data, (float, Decimal)):
+        value = abs(float(data))
+        return value == 0 or 1e-4 <= value < 1e16
+    if isinstance(data, dict):
+        return all(_floats_match(key) and _floats_match(value) for key, value in data.items())
+    if isinstance(data, (list, tuple)):
+        return all(map(_floats_match, data))
+    return True
+
+
+class StreamingJSONRenderer(JSONRenderer):
+    """JSON renderer that encodes with `orjson` if it's installed and can
+    render `StreamedList`s incrementally with `iter_render`.
+
+    Output is the same as `JSONRenderer`, types that `orjson` doesn't
+    encode the same way are passed to `encoder_class` and data with
+    floats that it writes differently is rendered by `JSONRenderer`.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (orjson is None or data is None or self.ensure_ascii or not self.compact
+                or self.get_indent(accepted_media_type, renderer_context or {})
+                or not _floats_match(data)):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(
+                data, default=self.encoder_class().default,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+            )
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same as `JSONRenderer`, these are valid JSON but not valid javascript
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+    def iter_render(self, data):
+        """Yields JSON of `data` in parts, `StreamedList`s are rendered chunk by chunk"""
+        if isinstance(data, StreamedList):
+            yield b'['
+            separator = b''
+            for chunk in data:
+                if chunk:
+                    yield separator + self.render(chunk)[1:-1]
+                    separator = b','
+            yield b']'
+        elif isinstance(data, dict):
+            yield b'{'
+            for index, (key, value) in enumerate(data.items()):
+                yield (b',' if index else b'') + self.render(str(key)) + b':'
+                yield from self.iter_render(value)
+            yield b'}'
+        elif data is None:
+            # `render` returns nothing for `None`
+            yield b'null'
+        else:
+            yield self.render(data)
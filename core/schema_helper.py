@@ -83,3 +83,8 @@ PAGINATION_DEFAULT = schema_generator({
     "next": "http://api.example.org/accounts/?offset=400&limit=100",
     "previous": "http://api.example.org/accounts/?offset=200&limit=100",
 })
+
+CURSOR_PAGINATION_DEFAULT = schema_generator({
+    "next": "http://api.example.org/accounts/?cursor=eyJ2YWx1ZSI6ICIyMDAwLTEyLTI5In0=",
+    "previous": None,
+})
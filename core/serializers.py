@@ -1,3 +1,10 @@
+from operator import attrgetter
+
+from django.db.models import Manager
+from rest_framework import serializers
+from rest_framework.fields import SerializerMethodField, SkipField
+from rest_framework.relations import PKOnlyObject, RelatedField
+
 from .utils import delete_pic_if_new_exists
 
 
@@ -5,3 +12,96 @@ class DeleteOldPicSerializerMixin:
     def update(self, instance, validated_data):
         delete_pic_if_new_exists(instance, validated_data)
         return super().update(instance, validated_data)
+
+
+class CompiledListSerializer(serializers.ListSerializer):
+    """Serializes many objects with a plan of fields that's compiled once per child class.
+
+    Method fields are called directly, primary keys and model fields are read
+    with plain attribute lookups and other fields fall back to DRF's generic way.
+    `to_representation` of the child isn't called, so subclasses should
+    replace what it overrides with `get_nested_representations` and
+    `extend_representation`. Fields of a child shouldn't change per instance.
+    """
+    _plans = {}
+
+    def get_nested_representations(self) -> dict:
+        """Maps field names to functions of an instance that represent them instead of the child"""
+        return {}
+
+    def extend_representation(self, instance, representation: dict):
+        """Adds fields that aren't declared on the child"""
+
+    @classmethod
+    def get_plan(cls, serializer) -> list[tuple]:
+        """`(field name, kind, argument)` of readable fields of `serializer`"""
+        serializer_class = type(serializer)
+        if serializer_class not in cls._plans:
+            model = getattr(getattr(serializer_class, 'Meta', None), 'model', None)
+            concrete_fields = {field.name: field for field in model._meta.concrete_fields} if model else {}
+
+            plan = []
+            for field in serializer._readable_fields:
+                model_field = concrete_fields.get(field.source)
+                if isinstance(field, SerializerMethodField):
+                    plan.append((field.field_name, 'method', field.method_name))
+                elif (isinstance(field, RelatedField) and model_field and model_field.is_relation
+                      and field.use_pk_only_optimization() and getattr(field, 'pk_field', None) is None):
+                    plan.append((field.field_name, 'pk', model_field.attname))
+                elif model_field and not model_field.is_relation:
+                    plan.append((field.field_name, 'attribute', model_field.attname))
+                else:
+                    plan.append((field.field_name, 'field', None))
+            cls._plans[serializer_class] = plan
+        return cls._plans[serializer_class]
+
+    def compile(self, serializer, nested: dict = None):
+        """Function that represents an instance like `serializer` does"""
+        nested = nested or {}
+        fields = serializer.fields
+        getters = []
+        for name, kind, argument in self.get_plan(serializer):
+            if name in nested:
+                getters.append((name, nested[name]))
+            elif kind == 'method':
+                getters.append((name, getattr(serializer, argument)))
+            elif kind == 'pk':
+                getters.append((name, attrgetter(argument)))
+            elif kind == 'attribute':
+                getters.append((name, self._compile_attribute(fields[name], argument)))
+            else:
+                getters.append((name, self._compile_field(fields[name])))
+
+        def represent(instance) -> dict:
+            representation = {}
+            for name, getter in getters:
+                try:
+                    representation[name] = getter(instance)
+                except SkipField:
+                    pass
+            return representation
+        return represent
+
+    def _compile_attribute(self, field, attname: str):
+        to_representation = field.to_representation
+
+        def represent(instance):
+            value = getattr(instance, attname)
+            return None if value is None else to_representation(value)
+        return represent
+
+    def _compile_field(self, field):
+        def represent(instance):
+            attribute = field.get_attribute(instance)
+            check_for_none = attribute.pk if isinstance(attribute, PKOnlyObject) else attribute
+            return None if check_for_none is None else field.to_representation(attribute)
+        return represent
+
+    def to_representation(self, data):
+        represent = self.compile(self.child, self.get_nested_representations())
+        ret = []
+        for instance in (data.all() if isinstance(data, Manager) else data):
+            representation = represent(instance)
+            self.extend_representation(instance, representation)
+            ret.append(representation)
+        return ret
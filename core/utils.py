@@ -1,5 +1,6 @@
 from rest_framework.viewsets import ModelViewSet
 from django.db.models.base import Model
+from django.utils.http import urlencode
 
 
 def all_methods(*methods, only_these: bool = False):
@@ -15,3 +16,10 @@ def all_methods(*methods, only_these: bool = False):
 def delete_pic_if_new_exists(instance: Model, validated_data, field_name='picture'):
     if validated_data.get(field_name):
         getattr(instance, field_name).delete()
+
+
+def get_sorted_query(request) -> str:
+    """Query string of the request with sorted params, so their order doesn't matter"""
+    return urlencode(sorted(
+        (key, value) for key, values in request.query_params.lists() for value in values
+    ))
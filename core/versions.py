@@ -0,0 +1,67 @@
+import time
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from django.core.cache import cache
+
+
+def _get_version_key(*parts) -> str:
+    return "version:" + ":".join(str(part) for part in parts)
+
+
+def _new_stamp() -> str:
+    return f"{int(time.time()):x}.{uuid4().hex[:16]}"
+
+
+def get_version(*parts) -> str:
+    """Returns version stamp of a resource, that changes on every `bump_version`.
+
+    Put it in cache keys of the resource, so bumping
+    invalidates all cached entries at once.
+    """
+    return cache.get_or_set(_get_version_key(*parts), _new_stamp, timeout=None)
+
+
+def bump_version(*parts):
+    cache.set(_get_version_key(*parts), _new_stamp(), timeout=None)
+
+
+def get_time_stamp(value: datetime) -> str:
+    """Version stamp of a row from it's modification time, like `updated_at`"""
+    return f"{int(value.timestamp()):x}.{value.microsecond:x}"
+
+
+def get_stamp_time(*stamps) -> datetime:
+    """Latest time that version stamps were bumped, stamps can be combined ones.
+
+    Returns `None` for stamps without time.
+    """
+    seconds = []
+    for stamp in stamps:
+        for part in stamp.split(':'):
+            if '.' not in part:
+                return None
+            seconds.append(int(part.split('.')[0], 16))
+    return datetime.fromtimestamp(max(seconds), tz=timezone.utc) if seconds else None
+
+
+def _get_model_parts(model) -> tuple:
+    return ('model', model._meta.label_lower)
+
+
+def get_models_version(*models) -> str:
+    """Combined version stamp of models, that changes when any of them is bumped.
+
+    Stamps are read with one cache call.
+    """
+    keys = [_get_version_key(*_get_model_parts(model)) for model in models]
+    versions = cache.get_many(keys)
+    for model, key in zip(models, keys):
+        if key not in versions:
+            versions[key] = get_version(*_get_model_parts(model))
+    return ":".join(versions[key] for key in keys)
+
+
+def bump_model_version(model):
+    """Call it when rows of a model change"""
+    bump_version(*_get_model_parts(model))
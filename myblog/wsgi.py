@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'myblog.settings')
 
 application = get_wsgi_application()
+
+# Imported after setup of apps
+from viewcount.buffer import start_flusher  # noqa: E402
+
+start_flusher()
@@ -0,0 +1,154 @@
+import random
+from collections import defaultdict
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.base import Model
+from django.utils import timezone
+
+from viewcount.rollups import count_all_views, count_views
+from social import settings as social_settings
+from .models import Comment, Counter, Like
+
+COUNTER_FIELDS = ('views', 'likes', 'dislikes', 'comments')
+
+
+def get_generic_kwargs(instance: Model) -> dict:
+    return {
+        "content_type": ContentType.objects.get_for_model(instance.__class__),
+        "object_id": instance.pk,
+    }
+
+
+def _get_generic_lookup(content_type, object_id) -> dict:
+    """`content_type` can be a `ContentType` or it's pk"""
+    return {
+        "content_type_id": getattr(content_type, 'pk', content_type),
+        "object_id": object_id,
+    }
+
+
+def count_raw(content_type, object_id) -> dict:
+    """Count engagements of an object from raw tables"""
+    generic_kwargs = _get_generic_lookup(content_type, object_id)
+
+    likes = dict(
+        Like.objects.filter(**generic_kwargs)
+        .values_list('status').annotate(count=Count('id')).order_by()
+    )
+    return {
+        "views": count_views(**generic_kwargs),
+        "likes": likes.get(Like.statuses.LIKE, 0),
+        "dislikes": likes.get(Like.statuses.DISLIKE, 0),
+        "comments": Comment.objects.filter(**generic_kwargs).count(),
+    }
+
+
+def rebuild_counter(content_type, object_id) -> Counter:
+    """Rebuild counter of an object from raw tables into it's first shard"""
+    lookup = _get_generic_lookup(content_type, object_id)
+    counter, created = Counter.objects.update_or_create(
+        **lookup, shard=0,
+        defaults=count_raw(content_type, object_id),
+    )
+    Counter.objects.filter(**lookup).exclude(shard=0).delete()
+    return counter
+
+
+def update_counter(content_type, object_id, **deltas):
+    """Add `deltas` to counters of an object.
+
+    Call it after writing raw rows. if object has no counter yet,
+    counter will be built from raw tables (which contains the new rows).
+    deltas are added to a random shard of object's counter.
+    """
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    lookup = _get_generic_lookup(content_type, object_id)
+    shard = random.randrange(social_settings.COUNTER_SHARDS)
+    counter = Counter.objects.filter(**lookup, shard=shard)
+    updates = {field: F(field) + delta for field, delta in deltas.items()}
+    updates['updated_at'] = timezone.now()
+
+    if counter.update(**updates):
+        return
+
+    rebuild = not Counter.objects.filter(**lookup).exists()
+    try:
+        with transaction.atomic():
+            if rebuild:
+                rebuild_counter(content_type, object_id)
+            else:
+                Counter.objects.create(**lookup, shard=shard, **deltas)
+    except IntegrityError:
+        if rebuild:
+            # Another request built the counter meanwhile, counting
+            # raw tables again includes rows of both requests once
+            rebuild_counter(content_type, object_id)
+        else:
+            # Another request created the shard meanwhile
+            counter.update(**updates)
+
+
+def update_instance_counter(instance: Model, **deltas):
+    update_counter(**get_generic_kwargs(instance), **deltas)
+
+
+def get_counts(content_type, object_id) -> dict:
+    """Returns summed counters of an object, or `None` if it has no counter.
+
+    Counts are cached for `COUNTER_CACHE_TTL` seconds.
+    """
+    lookup = _get_generic_lookup(content_type, object_id)
+    cache_key = "counter:{content_type_id}:{object_id}".format(**lookup)
+    ttl = social_settings.COUNTER_CACHE_TTL
+
+    if ttl and (counts := cache.get(cache_key)):
+        return counts
+
+    counts = Counter.objects.filter(**lookup).aggregate(
+        **{field: Sum(field) for field in COUNTER_FIELDS}
+    )
+    if counts['views'] is None:
+        return None
+
+    if ttl:
+        cache.set(cache_key, counts, ttl)
+    return counts
+
+
+def reconcile_counters(batch_size: int = 1000) -> int:
+    """Rebuild all counters from raw tables.
+
+    Returns number of rebuilt counters.
+    """
+    totals = defaultdict(lambda: dict.fromkeys(COUNTER_FIELDS, 0))
+    generic_fields = ('content_type_id', 'object_id')
+
+    for (ctype_id, oid), count in count_all_views().items():
+        totals[ctype_id, oid]['views'] = count
+
+    for ctype_id, oid, count in (Comment.objects.values_list(*generic_fields)
+                                 .annotate(count=Count('id')).order_by()):
+        totals[ctype_id, oid]['comments'] = count
+
+    like_fields = {
+        Like.statuses.LIKE: 'likes',
+        Like.statuses.DISLIKE: 'dislikes',
+    }
+    for ctype_id, oid, like_status, count in (Like.objects.values_list(*generic_fields, 'status')
+                                              .annotate(count=Count('id')).order_by()):
+        totals[ctype_id, oid][like_fields[like_status]] = count
+
+    with transaction.atomic():
+        Counter.objects.all().delete()
+        Counter.objects.bulk_create([
+            Counter(content_type_id=ctype_id, object_id=oid, **counts)
+            for (ctype_id, oid), counts in totals.items()
+        ], batch_size=batch_size)
+
+    return len(totals)
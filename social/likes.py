@@ -0,0 +1,128 @@
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+
+from core.versions import bump_model_version
+from .counters import _get_generic_lookup, update_counter
+from .models import Like
+
+LIKE_COUNTER_FIELDS = {
+    Like.statuses.LIKE: 'likes',
+    Like.statuses.DISLIKE: 'dislikes',
+}
+
+
+def get_counter_field(like_status) -> str:
+    return LIKE_COUNTER_FIELDS[like_status]
+
+
+def _get_opposite_status(like_status):
+    if like_status == Like.statuses.LIKE:
+        return Like.statuses.DISLIKE
+    return Like.statuses.LIKE
+
+
+def set_like(user, content_type, object_id, like_status) -> bool:
+    """Like or dislike an object and update it's counter.
+
+    Returns `True` if a new like is created.
+    """
+    try:
+        return _set_like(user, content_type, object_id, like_status)
+    except IntegrityError:
+        # Another request created the like meanwhile, the retry finds it
+        return _set_like(user, content_type, object_id, like_status)
+
+
+def _set_like(user, content_type, object_id, like_status) -> bool:
+    lookup = {"user": user, **_get_generic_lookup(content_type, object_id)}
+
+    # There are only two statuses, so flipped likes had the opposite one
+    if Like.objects.filter(**lookup).exclude(status=like_status).update(status=like_status):
+        bump_model_version(Like)
+        update_counter(content_type, object_id, **{
+            get_counter_field(_get_opposite_status(like_status)): -1,
+            get_counter_field(like_status): 1,
+        })
+        return False
+
+    if Like.objects.filter(**lookup).exists():
+        return False
+
+    with transaction.atomic():
+        Like.objects.create(status=like_status, **lookup)
+
+    update_counter(content_type, object_id, **{get_counter_field(like_status): 1})
+    return True
+
+
+def remove_like(user, content_type, object_id):
+    """Delete like of user on an object and update it's counter.
+
+    Returns status of the deleted like or `None`.
+    """
+    lookup = {"user": user, **_get_generic_lookup(content_type, object_id)}
+
+    for like_status in LIKE_COUNTER_FIELDS:
+        deleted, _ = Like.objects.filter(status=like_status, **lookup).delete()
+        if deleted:
+            update_counter(content_type, object_id, **{get_counter_field(like_status): -1})
+            return like_status
+    return None
+
+
+def bulk_set_likes(user, content_type, statuses: dict) -> int:
+    """Apply like statuses of many objects of a model in one transaction.
+
+    `statuses` maps object ids to a like status, or `None` to remove the like.
+    Returns number of changed likes.
+    """
+    try:
+        return _bulk_set_likes(user, content_type, statuses)
+    except IntegrityError:
+        # Another request created some of the likes meanwhile, the retry locks them
+        return _bulk_set_likes(user, content_type, statuses)
+
+
+def _bulk_set_likes(user, content_type, statuses: dict) -> int:
+    lookup = {"user": user, "content_type_id": getattr(content_type, 'pk', content_type)}
+    likes = Like.objects.filter(**lookup)
+
+    with transaction.atomic():
+        existing = dict(
+            likes.select_for_update().filter(object_id__in=statuses)
+            .values_list('object_id', 'status')
+        )
+
+        to_create, to_delete = [], []
+        to_update = defaultdict(list)
+        deltas = defaultdict(lambda: defaultdict(int))
+        for object_id, like_status in statuses.items():
+            old_status = existing.get(object_id)
+            if old_status == like_status:
+                continue
+
+            if old_status:
+                deltas[object_id][get_counter_field(old_status)] -= 1
+            if like_status:
+                deltas[object_id][get_counter_field(like_status)] += 1
+
+            if not like_status:
+                to_delete.append(object_id)
+            elif old_status:
+                to_update[like_status].append(object_id)
+            else:
+                to_create.append(Like(object_id=object_id, status=like_status, **lookup))
+
+        Like.objects.bulk_create(to_create)
+        for like_status, object_ids in to_update.items():
+            likes.filter(object_id__in=object_ids).update(status=like_status)
+        if to_delete:
+            likes.filter(object_id__in=to_delete).delete()
+
+        for object_id, object_deltas in deltas.items():
+            update_counter(content_type, object_id, **object_deltas)
+
+    # Bulk writes don't send signals
+    bump_model_version(Like)
+    return len(deltas)
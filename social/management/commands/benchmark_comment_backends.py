@@ -0,0 +1,61 @@
+import random
+import time
+from unittest.mock import patch
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from social.models import Comment
+from social.tree_backends import TREE_BACKENDS, get_tree_backend
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare inserts and reads of comment tree backends under a burst of replies "
+        "to random comments of a few threads. written comments are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=5, help="Root comments")
+        parser.add_argument('--replies', type=int, default=2000)
+        parser.add_argument('--page-size', type=int, default=10)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        for backend in TREE_BACKENDS:
+            with patch('social.settings.COMMENT_TREE_BACKEND', backend), transaction.atomic():
+                self._run(backend, options)
+                transaction.set_rollback(True)
+
+    def _run(self, backend, options):
+        rand = random.Random(options['seed'])
+        generic_kwargs = {
+            "content_type": ContentType.objects.get_for_model(Comment),
+            "object_id": 0,
+        }
+
+        def create_comment(reply_to=None):
+            return Comment.objects.create(text="Benchmark", _name="John Doe", reply_to=reply_to, **generic_kwargs)
+
+        started = time.perf_counter()
+        comments = [create_comment() for _ in range(options['threads'])]
+        for _ in range(options['replies']):
+            comments.append(create_comment(rand.choice(comments)))
+        insert_duration = time.perf_counter() - started
+
+        queryset = Comment.objects.filter(**generic_kwargs)
+        started = time.perf_counter()
+        get_tree_backend().get_trees(queryset)
+        read_duration = time.perf_counter() - started
+
+        started = time.perf_counter()
+        root_keys = get_tree_backend().get_root_keys(queryset)[:options['page_size']]
+        get_tree_backend().get_trees(queryset, list(root_keys))
+        page_duration = time.perf_counter() - started
+
+        self.stdout.write(
+            f"{backend}: {len(comments)} inserts in {insert_duration:.2f}s "
+            f"({insert_duration / len(comments) * 1000:.2f}ms each), "
+            f"full read {read_duration * 1000:.1f}ms, page read {page_duration * 1000:.1f}ms"
+        )
@@ -0,0 +1,81 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework import serializers
+
+from social.models import Comment
+from social.serializers import CommentSerializer
+
+
+class RecursiveCommentSerializer(CommentSerializer):
+    """Serializes replies with a serializer per node"""
+
+    class Meta(CommentSerializer.Meta):
+        list_serializer_class = serializers.ListSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare recursive and single-pass comment tree serializers "
+        "over synthetic deep and wide threads. comments are built in memory."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--depth', type=int, default=100, help="Replies in the deep thread")
+        parser.add_argument('--width', type=int, default=2000, help="Replies in the wide thread")
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        threads = {
+            'deep': self._build_thread([1] * options['depth']),
+            'wide': self._build_thread([options['width']]),
+            'mixed': self._build_thread([50, 10, 4]),
+        }
+
+        for name, roots in threads.items():
+            recursive = self._measure(RecursiveCommentSerializer, roots, options['repeat'])
+            single_pass = self._measure(CommentSerializer, roots, options['repeat'])
+            if recursive[1] != single_pass[1]:
+                raise CommandError(f"Outputs of {name} thread are different")
+
+            self.stdout.write(
+                f"{name}: recursive {recursive[0] * 1000:.1f}ms, "
+                f"single pass {single_pass[0] * 1000:.1f}ms"
+            )
+        self.stdout.write(self.style.SUCCESS("Outputs are identical"))
+
+    def _measure(self, serializer_class, roots, repeat):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            data = serializer_class(roots, many=True).data
+            duration = time.perf_counter() - started
+            best = duration if best is None else min(best, duration)
+        return best, data
+
+    def _build_thread(self, widths: list[int]) -> list[Comment]:
+        """Build a tree in memory that each node of level `i` has `widths[i]` replies"""
+        created_at = timezone.now()
+        nodes = []
+
+        def new_node(parent, level):
+            node = Comment(
+                id=len(nodes) + 1, text="Synthetic comment", _name="John Doe", is_accepted=True,
+                reply_to=parent, tree_id=1, level=level,
+                content_type_id=1, object_id=1, created_at=created_at,
+            )
+            node._cached_children = []
+            nodes.append(node)
+            return node
+
+        root = new_node(None, 0)
+        pending = [root]
+        while pending:
+            parent = pending.pop()
+            if parent.level < len(widths):
+                for _ in range(widths[parent.level]):
+                    child = new_node(parent, parent.level + 1)
+                    parent._cached_children.append(child)
+                    pending.append(child)
+        return [root]
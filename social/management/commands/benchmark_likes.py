@@ -0,0 +1,83 @@
+import threading
+import time
+from unittest.mock import patch
+from uuid import uuid4
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework.viewsets import GenericViewSet
+
+from social.counters import get_counts, get_generic_kwargs
+from social.mixins import LikeMixin
+from social.models import Counter, Like
+
+
+class BenchmarkLikeViewSet(LikeMixin, GenericViewSet):
+    queryset = get_user_model().objects.all()
+    throttle_classes = []
+
+
+class Command(BaseCommand):
+    help = (
+        "Simulate concurrent like toggles on one user through `LikeMixin.like` "
+        "and compare single-row counters against sharded counters. "
+        "temporary users are created and deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--toggles', type=int, default=50, help="Like toggles per thread")
+        parser.add_argument('--shards', type=int, default=8)
+
+    def handle(self, *args, **options):
+        users = [
+            get_user_model().objects.create_user(email=f"benchmark-{uuid4()}@example.com")
+            for _ in range(options['threads'] + 1)
+        ]
+        target, likers = users[0], users[1:]
+        try:
+            for shards in [1, options['shards']]:
+                self._run(target, likers, shards, options['toggles'])
+        finally:
+            Counter.objects.filter(**get_generic_kwargs(target)).delete()
+            Like.objects.filter(user__in=users).delete()
+            get_user_model().objects.filter(pk__in=[user.pk for user in users]).delete()
+
+    def _run(self, target, likers, shards, toggles):
+        Like.objects.filter(**get_generic_kwargs(target)).delete()
+        Counter.objects.filter(**get_generic_kwargs(target)).delete()
+
+        view = BenchmarkLikeViewSet.as_view({'post': 'like'})
+        factory = APIRequestFactory()
+        errors = []
+
+        def toggle_likes(user):
+            try:
+                for i in range(toggles):
+                    request = factory.post('/', {'status': ['L', 'DL'][i % 2]})
+                    force_authenticate(request, user)
+                    view(request, pk=target.pk)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=toggle_likes, args=[user]) for user in likers]
+        with patch('social.settings.COUNTER_SHARDS', shards):
+            started = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            duration = time.perf_counter() - started
+
+        total = len(likers) * toggles
+        error_types = ', '.join(sorted({type(e).__name__ for e in errors}))
+        counts = get_counts(**get_generic_kwargs(target)) or {}
+        self.stdout.write(
+            f"{shards} shard(s): {total} toggles in {duration:.2f}s "
+            f"({total / duration:.0f}/s), {len(errors)} errors {error_types}, "
+            f"likes={counts.get('likes')} dislikes={counts.get('dislikes')}"
+        )
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from social import settings as social_settings
+from social.models import Comment
+from social.tree_backends import TREE_BACKENDS, rebuild_paths
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild comment trees of a tree backend from `reply_to` of comments. "
+        "run it for `mptt` after comments were written with `path` backend."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--backend', choices=TREE_BACKENDS, default=social_settings.COMMENT_TREE_BACKEND)
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if options['backend'] == 'mptt':
+            Comment.objects.rebuild()
+            count = Comment.objects.count()
+        else:
+            count = rebuild_paths(Comment, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"{count} comments rebuilt"))
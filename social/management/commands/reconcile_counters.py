@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from social.counters import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = "Rebuild engagement counters from views, likes and comments tables"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        count = reconcile_counters(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"{count} counters rebuilt"))
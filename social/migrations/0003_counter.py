@@ -0,0 +1,38 @@
+# Generated by Django 3.2.9 on 2026-10-18 18:04
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('social', '0002_comment_is_accepted'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='like',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='user_likes', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.CreateModel(
+            name='Counter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('views', models.IntegerField(default=0, verbose_name='Views')),
+                ('likes', models.IntegerField(default=0, verbose_name='Likes')),
+                ('dislikes', models.IntegerField(default=0, verbose_name='Dislikes')),
+                ('comments', models.IntegerField(default=0, verbose_name='Comments')),
+                ('object_id', models.PositiveIntegerField()),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='counter',
+            constraint=models.UniqueConstraint(fields=('content_type', 'object_id'), name='unique_counter_object'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.9 on 2026-10-18 18:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('social', '0003_counter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='counter',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Updated at'),
+        ),
+    ]
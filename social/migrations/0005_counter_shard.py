@@ -0,0 +1,26 @@
+# Generated by Django 3.2.9 on 2026-10-18 18:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('social', '0004_counter_updated_at'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='counter',
+            name='unique_counter_object',
+        ),
+        migrations.AddField(
+            model_name='counter',
+            name='shard',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddConstraint(
+            model_name='counter',
+            constraint=models.UniqueConstraint(fields=('content_type', 'object_id', 'shard'), name='unique_counter_shard'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.9 on 2026-10-18 18:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('social', '0005_counter_shard'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='like',
+            index=models.Index(fields=['user', 'content_type', 'object_id'], name='social_like_user_id_e42cd2_idx'),
+        ),
+    ]
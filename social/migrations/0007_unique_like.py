@@ -0,0 +1,41 @@
+# Generated by Django 3.2.9 on 2026-10-18 18:19
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def delete_duplicate_likes(apps, schema_editor):
+    """Keep the latest like of every user on an object.
+
+    Counters may count deleted duplicates, run `reconcile_counters` afterwards.
+    """
+    Like = apps.get_model('social', 'Like')
+    duplicates = (Like.objects.values('user', 'content_type', 'object_id')
+                  .annotate(count=Count('id'), last_id=Max('id'))
+                  .filter(count__gt=1).order_by())
+
+    for duplicate in duplicates:
+        Like.objects.filter(
+            user=duplicate['user'],
+            content_type=duplicate['content_type'],
+            object_id=duplicate['object_id'],
+        ).exclude(pk=duplicate['last_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('social', '0006_like_user_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicate_likes, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='like',
+            constraint=models.UniqueConstraint(fields=('user', 'content_type', 'object_id'), name='unique_like'),
+        ),
+        migrations.RemoveIndex(
+            model_name='like',
+            name='social_like_user_id_e42cd2_idx',
+        ),
+    ]
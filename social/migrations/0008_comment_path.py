@@ -0,0 +1,43 @@
+# Generated by Django 3.2.9 on 2026-10-18 18:26
+
+import string
+
+from django.db import migrations, models
+
+PATH_STEP_LENGTH = 7
+PATH_DIGITS = string.digits + string.ascii_lowercase
+
+
+def get_path_step(pk):
+    step = ''
+    while pk:
+        pk, digit = divmod(pk, len(PATH_DIGITS))
+        step = PATH_DIGITS[digit] + step
+    return step.rjust(PATH_STEP_LENGTH, '0')
+
+
+def set_comment_paths(apps, schema_editor):
+    Comment = apps.get_model('social', 'Comment')
+    paths = {}
+    comments = []
+    for pk, parent_id in Comment.objects.order_by('pk').values_list('pk', 'reply_to_id').iterator():
+        # Replies are always created after the comment they reply to
+        paths[pk] = paths.get(parent_id, '') + get_path_step(pk)
+        comments.append(Comment(pk=pk, path=paths[pk]))
+    Comment.objects.bulk_update(comments, ['path'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('social', '0007_unique_like'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='path',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=255),
+        ),
+        migrations.RunPython(set_comment_paths, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 3.2.9 on 2026-10-18 18:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('social', '0008_comment_path'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['is_accepted', 'created_at'], name='social_comm_is_acce_d57777_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['hidden', 'created_at'], name='social_comm_hidden_268838_idx'),
+        ),
+    ]
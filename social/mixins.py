@@ -4,13 +4,16 @@ from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from django.contrib.contenttypes.models import ContentType
+from rest_framework.exceptions import ValidationError
 from django.http.response import Http404
 
 from social.schemas import LIKE_DISLIKED_RESPONSE, LIKE_LIKED_RESPONSE, LIKE_NOTLIKED_RESPONSE
 
-from .serializers import LikeSerializer
+from .serializers import BulkLikeSerializer, CommentTreeQuerySerializer, LikeSerializer
+from .counters import get_generic_kwargs
+from .likes import bulk_set_likes, remove_like, set_like
 from .models import Like
-from .utils import liked_by_user
+from .utils import get_missing_counters, get_user_likes
 from core.utils import all_methods
 
 
@@ -41,40 +44,116 @@ class LikeMixin:
     def like(self, request, *args, **kwargs):
         instance = self.get_object()
         user = self.request.user
-        like = liked_by_user(
-            getattr(instance, self.model_like_field).all(),
-            user=user
-        )
+        generic_kwargs = get_generic_kwargs(instance)
+
         if request.method == 'POST':
             self.like_comparer(instance, request)
             serializer = self.get_serializer(data=request.data)
             serializer.is_valid(raise_exception=True)
 
             like_status = serializer.data.get('status')
+            created = set_like(user, **generic_kwargs, like_status=like_status)
 
-            if like:
-                like.status = like_status
-                like.save()
-                status_code = status.HTTP_200_OK
-            else:
-                like = Like.objects.create(
-                    user=user, object_id=instance.pk,
-                    status=like_status,
-                    content_type=ContentType.objects.get_for_model(instance.__class__),
-                )
-                status_code = status.HTTP_201_CREATED
-
-            serializer = self.get_serializer(like)
-            return Response(serializer.data, status=status_code)
+            serializer = self.get_serializer(Like(user=user, status=like_status))
+            return Response(serializer.data, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
 
         else:
 
             if request.method == 'GET':
+                like = getattr(instance, self.model_like_field).filter(user=user).first()
                 if not like:
                     return Response(data={"status": None, "user": user.id})
                 serializer = self.get_serializer(like)
                 return Response(serializer.data)
 
-            if request.method == 'DELETE' and like:
-                like.delete()
+            if request.method == 'DELETE':
+                remove_like(user, **generic_kwargs)
             return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class LikeListMixin:
+    """Adds likes of requesting user on listed objects to serializer context,
+    so `liked_by_user` doesn't need all likes of every object"""
+
+    def get_serializer(self, *args, **kwargs):
+        if kwargs.get('many') and args:
+            objects = list(args[0])
+            kwargs.setdefault('context', self.get_serializer_context())
+            kwargs['context']["user_likes"] = get_user_likes(objects, self.request.user)
+            args = (objects, *args[1:])
+        return super().get_serializer(*args, **kwargs)
+
+
+class CounterListMixin:
+    """Adds counters of listed objects that have no counter rows yet to serializer
+    context, so their counts are loaded for the whole list in grouped queries"""
+
+    def get_serializer(self, *args, **kwargs):
+        if kwargs.get('many') and args:
+            objects = list(args[0])
+            kwargs.setdefault('context', self.get_serializer_context())
+            kwargs['context']["counters"] = get_missing_counters(objects)
+            args = (objects, *args[1:])
+        return super().get_serializer(*args, **kwargs)
+
+
+class BulkLikeMixin:
+    """Like, dislike or unlike many objects in one request.
+
+    Use it with a list viewset, objects are looked up in it's filtered queryset
+    and `LikeMixin.like_comparer` is called for each of them if the viewset has it.
+    """
+
+    def get_serializer_class(self):
+        if self.action == 'bulk_like':
+            return BulkLikeSerializer
+        return super().get_serializer_class()
+
+    def get_permissions(self):
+        if self.action == 'bulk_like':
+            return [IsAuthenticated()]
+        return super().get_permissions()
+
+    @extend_schema(request=BulkLikeSerializer(many=True), responses=BulkLikeSerializer(many=True))
+    @action(detail=False, methods=all_methods('post', only_these=True), url_path='likes')
+    def bulk_like(self, request, *args, **kwargs):
+        """Set like status of many objects, `null` status removes the like"""
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        statuses = {item['id']: item['status'] for item in serializer.validated_data}
+
+        instances = self.filter_queryset(self.get_queryset()).filter(pk__in=statuses)
+        like_comparer = getattr(self, 'like_comparer', None)
+        found_ids = set()
+        for instance in instances:
+            if like_comparer:
+                like_comparer(instance, request)
+            found_ids.add(instance.pk)
+
+        if missing_ids := set(statuses) - found_ids:
+            raise ValidationError({
+                "id": [f"Invalid pk \"{pk}\" - object does not exist." for pk in sorted(missing_ids)]
+            })
+
+        content_type = ContentType.objects.get_for_model(self.get_queryset().model)
+        bulk_set_likes(request.user, content_type, statuses)
+
+        serializer = BulkLikeSerializer(
+            [{"id": pk, "status": like_status} for pk, like_status in statuses.items()],
+            many=True
+        )
+        return Response(serializer.data)
+
+
+class ReplyLimitsMixin:
+    """Reads limits of inline replies in comment trees from query params"""
+
+    def get_reply_limits(self) -> dict:
+        """`max_depth` and `max_replies` that are set in the query params"""
+        serializer = CommentTreeQuerySerializer(data=self.request.query_params)
+        serializer.is_valid(raise_exception=True)
+        return dict(serializer.validated_data)
+
+    def get_reply_limits_context(self) -> dict:
+        limits = self.get_reply_limits()
+        return {'reply_limits': limits} if limits else {}
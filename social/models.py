@@ -1,4 +1,4 @@
-from django.db.models.fields import CharField, DateTimeField, EmailField, PositiveIntegerField, TextField, BooleanField
+from django.db.models.fields import CharField, DateTimeField, EmailField, IntegerField, PositiveIntegerField, PositiveSmallIntegerField, TextField, BooleanField
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.auth.models import BaseUserManager
@@ -7,11 +7,15 @@ from django.db.models.fields.related import ForeignKey
 from django.db.models.enums import TextChoices
 from django.db.models.deletion import CASCADE
 from django.db.models.base import Model
+from django.db.models.constraints import UniqueConstraint
+from django.db.models.indexes import Index
 from django.utils.html import escape
 from django.conf import settings
 
 from mptt.models import MPTTModel, TreeForeignKey
 
+from .tree_backends import get_tree_backend
+
 User = settings.AUTH_USER_MODEL
 
 
@@ -34,6 +38,14 @@ class TaggedItem(Model):
     object_id = PositiveIntegerField()
     content_object = GenericForeignKey()
 
+    class Meta:
+        indexes = [
+            # Objects of a tag, covers semi-joins of tag filters
+            Index(fields=['tag', 'content_type', 'object_id']),
+            # Tags of objects, for prefetching them
+            Index(fields=['content_type', 'object_id']),
+        ]
+
 
 class Like(Model):
     class statuses(TextChoices):
@@ -47,6 +59,35 @@ class Like(Model):
     object_id = PositiveIntegerField()
     content_object = GenericForeignKey()
 
+    class Meta:
+        constraints = [
+            UniqueConstraint(fields=['user', 'content_type', 'object_id'], name='unique_like'),
+        ]
+
+
+class Counter(Model):
+    """Denormalized engagement counters of an object.
+
+    Counters are updated by write paths and can be
+    rebuilt from raw tables with `reconcile_counters` command.
+    An object may have multiple shards that should be summed.
+    """
+    views = IntegerField(_("Views"), default=0)
+    likes = IntegerField(_("Likes"), default=0)
+    dislikes = IntegerField(_("Dislikes"), default=0)
+    comments = IntegerField(_("Comments"), default=0)
+    shard = PositiveSmallIntegerField(default=0)
+    updated_at = DateTimeField(_("Updated at"), auto_now=True, db_index=True)
+
+    content_type = ForeignKey(to=ContentType, on_delete=CASCADE)
+    object_id = PositiveIntegerField()
+    content_object = GenericForeignKey()
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(fields=['content_type', 'object_id', 'shard'], name='unique_counter_shard'),
+        ]
+
 
 class Comment(MPTTModel):
     text = TextField(_("Text"), max_length=300)
@@ -73,10 +114,20 @@ class Comment(MPTTModel):
     object_id = PositiveIntegerField()
     content_object = GenericForeignKey()
 
+    path = CharField(max_length=255, default='', editable=False, db_index=True)
+    """Materialized path of pks from root, used by `path` tree backend"""
+
     class MPTTMeta:
         order_insertion_by = ['created_at']
         parent_attr = 'reply_to'
 
+    class Meta:
+        indexes = [
+            # Moderation queues, paginated by (created_at, id)
+            Index(fields=['is_accepted', 'created_at']),
+            Index(fields=['hidden', 'created_at']),
+        ]
+
     def clean(self):
         super().clean()
         if self.user:
@@ -89,7 +140,10 @@ class Comment(MPTTModel):
 
     def save(self, *args, **kwargs):
         self.clean()
-        return super().save(*args, **kwargs)
+        return get_tree_backend().save(self, super().save, *args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        return get_tree_backend().delete(self, *args, **kwargs)
 
     @property
     def name(self):
@@ -0,0 +1,28 @@
+from core.paginations import KeysetPagination, OffsetOrKeysetPagination
+from .tree_backends import get_tree_backend
+
+
+class CommentTreePagination(OffsetOrKeysetPagination):
+    """Paginates root comments in database and returns their cached trees.
+
+    Only descendants of the root comments in the page are fetched,
+    with one query by the tree backend.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        backend = get_tree_backend()
+        if self.is_keyset(request):
+            roots = super().paginate_queryset(backend.get_roots(queryset), request, view)
+            root_keys = [getattr(root, backend.root_key_field) for root in roots]
+        else:
+            root_keys = super().paginate_queryset(backend.get_root_keys(queryset), request, view)
+        if root_keys is None:
+            return None
+
+        limits = view.get_reply_limits() if view is not None else {}
+        return backend.get_trees(queryset, root_keys, **limits)
+
+
+class RepliesPagination(KeysetPagination):
+    """Paginates replies of a comment in the order they are shown in trees"""
+    ordering = 'created_at'
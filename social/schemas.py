@@ -1,5 +1,5 @@
 from drf_spectacular.utils import OpenApiExample
-from core.schema_helper import PAGINATION_DEFAULT, RESPONSE_DEFAULT_LIST, RESPONSE_DEFAULT_PAGINATED, RESPONSE_DEFAULT_RETRIEVE, schema_generator
+from core.schema_helper import CURSOR_PAGINATION_DEFAULT, PAGINATION_DEFAULT, RESPONSE_DEFAULT_LIST, RESPONSE_DEFAULT_PAGINATED, RESPONSE_DEFAULT_RETRIEVE, schema_generator
 from social.models import Like
 
 
@@ -75,12 +75,15 @@ COMMENT_UPDATE_ADMIN = OpenApiExample(
     })
 )
 
-COMMENT_RESPONSE_NOREPLY = OpenApiExample(
-    **RESPONSE_DEFAULT_LIST,
-    value=[schema_generator({
-        **_base_comment,
-        "replies": None,
-    })]
+COMMENT_RESPONSE_CURSOR_PAGINATED = OpenApiExample(
+    **RESPONSE_DEFAULT_PAGINATED,
+    value={
+        **CURSOR_PAGINATION_DEFAULT,
+        "results": [schema_generator({
+            **_base_comment,
+            "replies": None,
+        })]
+    }
 )
 
 LIKE_LIKED_RESPONSE = OpenApiExample(
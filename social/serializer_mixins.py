@@ -1,11 +1,23 @@
 from django.contrib.contenttypes.models import ContentType
 
+from core.versions import bump_model_version
 from .models import Like, TaggedItem
-from .utils import count_likes_by_status, liked_by_user
+from .utils import count_likes_by_status, get_counter
 from .serializers import TaggedItemSerializer
 
 
-class LikeSerializerMixin:
+class CounterSerializerMixin:
+    def _get_counter(self, instance):
+        """Prefetched counter of the instance, or the one counted for
+        a page without counter rows (`counters` of the context)"""
+        if counter := get_counter(instance):
+            return counter
+        if (counters := self.context.get("counters")) is not None:
+            return counters.get(instance.pk)
+        return None
+
+
+class LikeSerializerMixin(CounterSerializerMixin):
     model_like_field = 'likes'
     """You can change this in your subclass"""
 
@@ -15,9 +27,10 @@ class LikeSerializerMixin:
     def get_liked_by_user(self, instance) -> bool:
         request = self.context.get("request")
         if request and request.user.is_authenticated:
-            like = liked_by_user(
-                self._get_likes(instance),
-                user=request.user)
+            if (user_likes := self.context.get("user_likes")) is not None:
+                like = user_likes.get(instance.pk)
+            else:
+                like = self._get_likes(instance).filter(user=request.user).first()
 
             if like:
                 return like.status == Like.statuses.LIKE
@@ -25,12 +38,16 @@ class LikeSerializerMixin:
         return None
 
     def get_likes(self, instance) -> int:
+        if counter := self._get_counter(instance):
+            return counter.likes
         return count_likes_by_status(
             self._get_likes(instance),
             status=Like.statuses.LIKE
         )
 
     def get_dislikes(self, instance) -> int:
+        if counter := self._get_counter(instance):
+            return counter.dislikes
         return count_likes_by_status(
             self._get_likes(instance),
             status=Like.statuses.DISLIKE
@@ -49,6 +66,7 @@ class TagSerializerMixin:
                 TaggedItem(tag=tag, content_type=ctype, object_id=instance.pk)
                 for tag in tags
             ])
+            bump_model_version(TaggedItem)
 
         return instance
 
@@ -58,9 +76,11 @@ class TagSerializerMixin:
         return rep
 
 
-class CommentSerializerMixin:
+class CommentSerializerMixin(CounterSerializerMixin):
     model_comment_field = 'comments'
     """You can change this in your subclass"""
 
     def get_comments_count(self, instance) -> int:
+        if counter := self._get_counter(instance):
+            return counter.comments
         return getattr(instance, self.model_comment_field).count()
@@ -1,9 +1,17 @@
+from collections import OrderedDict
+
+from django.db.models import Manager
 from drf_spectacular.utils import extend_schema_serializer
 from rest_framework import serializers
 from rest_framework.fields import CharField, EmailField
+from rest_framework.relations import PKOnlyObject
+from rest_framework.reverse import reverse
+from rest_framework.utils.urls import replace_query_param
 
 from social.schemas import COMMENT_RESPONSE_RETRIEVE
 from .models import Like, Tag, TaggedItem, Comment
+from .paginations import RepliesPagination
+from .tree_backends import MAX_LEVEL, get_tree_backend
 
 
 class TagSerializer(serializers.ModelSerializer):
@@ -41,6 +49,81 @@ class LikeSerializer(serializers.ModelSerializer):
         }
 
 
+class BulkLikeSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    status = serializers.ChoiceField(choices=Like.statuses.choices, allow_null=True)
+
+
+class CommentTreeListSerializer(serializers.ListSerializer):
+    """Serializes comment trees in one pass instead of a serializer per reply.
+
+    Nodes are walked in MPTT order and every representation is appended
+    to `replies` of the last node with a lower level.
+    When `reply_limits` is in the context, every node gets a `more_replies`
+    link to the replies that are left out of the tree.
+    """
+    replies_field = 'replies'
+    more_replies_field = 'more_replies'
+
+    def get_more_replies_link(self, node) -> str:
+        if not getattr(node, 'replies_truncated', False):
+            return None
+
+        url = reverse('social:comments-replies', kwargs={'pk': node.pk}, request=self.context.get('request'))
+        for key, value in self.context['reply_limits'].items():
+            url = replace_query_param(url, key, value)
+        children = getattr(node, '_cached_children', None)
+        if children:
+            # Continue after the last reply in the tree
+            return RepliesPagination().encode_cursor(children[-1], reverse=False, base_url=url)
+        return url
+
+    def _iter_nodes(self, roots):
+        stack = list(reversed(roots))
+        while stack:
+            node = stack.pop()
+            yield node
+            children = getattr(node, '_cached_children', None)
+            if children is None:
+                # Fetch whole subtree in one query, it's nodes have cached children
+                children = get_tree_backend().get_descendant_trees(node)
+            stack.extend(reversed(children))
+
+    def to_representation(self, data):
+        if self.context.get("no-reply"):
+            return super().to_representation(data)
+
+        fields = list(self.child._readable_fields)
+        limited = 'reply_limits' in self.context
+        ret = []
+        parents = []
+        for node in self._iter_nodes(list(data.all() if isinstance(data, Manager) else data)):
+            representation = OrderedDict()
+            for field in fields:
+                if field.field_name == self.replies_field:
+                    representation[field.field_name] = []
+                    continue
+
+                attribute = field.get_attribute(node)
+                check_for_none = attribute.pk if isinstance(attribute, PKOnlyObject) else attribute
+                if check_for_none is None:
+                    representation[field.field_name] = None
+                else:
+                    representation[field.field_name] = field.to_representation(attribute)
+            if limited:
+                representation[self.more_replies_field] = self.get_more_replies_link(node)
+
+            while parents and parents[-1][0] >= node.level:
+                parents.pop()
+            if parents:
+                parents[-1][1].append(representation)
+            else:
+                ret.append(representation)
+            parents.append((node.level, representation[self.replies_field]))
+
+        return ret
+
+
 @extend_schema_serializer(examples=[COMMENT_RESPONSE_RETRIEVE])
 class CommentSerializer(serializers.ModelSerializer):
     replies = serializers.SerializerMethodField()
@@ -62,6 +145,7 @@ class CommentSerializer(serializers.ModelSerializer):
             'replies',
             'created_at',
         ]
+        list_serializer_class = CommentTreeListSerializer
         extra_kwargs = {
             'is_accepted': {"read_only": True},
             'user': {'read_only': True},
@@ -78,12 +162,32 @@ class CommentSerializer(serializers.ModelSerializer):
                 raise serializers.ValidationError({
                     "reply_to": f"Invalid pk \"{reply}\" - object does not exist."
                 })
+            if reply.level >= MAX_LEVEL:
+                raise serializers.ValidationError({
+                    "reply_to": "Replies can't be nested deeper."
+                })
         return reply
 
     def get_replies(self, obj):
         if self.context.get("no-reply"):
             return None
-        return self.__class__(obj.get_children(), many=True, context=self.context).data
+        children = getattr(obj, '_cached_children', None)
+        if children is None:
+            # Fetch whole subtree in one query
+            children = get_tree_backend().get_descendant_trees(obj)
+        return self.__class__(children, many=True, context=self.context).data
+
+
+class CommentTreeQuerySerializer(serializers.Serializer):
+    max_depth = serializers.IntegerField(min_value=0, max_value=MAX_LEVEL, required=False,
+                                         help_text="Levels of replies returned inline")
+    max_replies = serializers.IntegerField(min_value=1, required=False,
+                                           help_text="Replies returned inline for each comment")
+
+
+class CommentBulkSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, max_length=1000, write_only=True)
+    count = serializers.IntegerField(read_only=True)
 
 
 class CommentUpdateSerializer(serializers.ModelSerializer):
@@ -0,0 +1,25 @@
+from django.conf import settings
+
+COUNTER_SHARDS = getattr(settings, 'SOCIAL_COUNTER_SHARDS', 1)
+"""
+Counters of every object are spread over this many rows,
+so concurrent updates of a hot object don't wait for one row lock.
+"""
+
+COUNTER_CACHE_TTL = getattr(settings, 'SOCIAL_COUNTER_CACHE_TTL', 0)
+"""Seconds that summed counters are cached, `0` disables caching"""
+
+COMMENT_TREE_BACKEND = getattr(settings, 'SOCIAL_COMMENT_TREE_BACKEND', 'mptt')
+"""
+Storage that comment trees are read and written with, `mptt` or `path`.
+`path` appends materialized paths instead of shifting nested sets
+of the whole thread on every reply.
+run `rebuild_comment_trees` before switching back to `mptt`.
+"""
+
+COMMENT_CACHE_TTL = getattr(settings, 'SOCIAL_COMMENT_CACHE_TTL', 0)
+"""
+Seconds that serialized comment threads are cached, `0` disables caching.
+threads are invalidated on writes, use a shared cache backend
+if you run multiple processes.
+"""
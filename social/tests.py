@@ -1,13 +1,23 @@
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
+from django.db import IntegrityError
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
 from rest_framework import status
 from rest_framework.test import APIClient
 from django.test import TestCase
 from django.urls import reverse
+from unittest.mock import patch
 from uuid import uuid4
+import os
 
-from .models import Comment
+from .counters import get_counts, get_generic_kwargs, rebuild_counter, update_counter
+from .likes import bulk_set_likes, set_like
+from .management.commands.benchmark_comment_tree import RecursiveCommentSerializer
+from .models import Comment, Counter, Like
+from .serializers import CommentSerializer
+from .tree_backends import get_tree_backend
 
 
 def comment_detail_url(pk):
@@ -140,3 +150,265 @@ class CommentTest(TestCase):
             res.status_code, status.HTTP_403_FORBIDDEN,
             msg=res.status_code
         )
+
+    def test_comment_tree_pagination(self):
+        roots = [self._create_comment(self.user) for _ in range(3)]
+        reply = self._create_comment(self.user, reply_to=roots[1])
+        self._create_comment(self.user, reply_to=reply)
+        self._create_comment(self.user, reply_to=roots[2])
+
+        compliments_url = reverse("blog:user-comment-list", args=[self.user.pk])
+        with self.assertNumQueries(5):
+            res = self.user2_client.get(compliments_url, {"limit": 2, "offset": 1})
+        self.assertEqual(res.data['count'], 4)
+
+        def get_tree(comments):
+            return [(comment['id'], get_tree(comment['replies'])) for comment in comments]
+
+        self.assertEqual(get_tree(res.data['results']), [
+            (roots[0].pk, []),
+            (roots[1].pk, [(reply.pk, [(reply.pk + 1, [])])]),
+        ])
+
+    def test_comment_tree_cursor_pagination(self):
+        roots = [self._create_comment(self.user) for _ in range(3)]
+        reply = self._create_comment(self.user, reply_to=roots[1])
+        compliments_url = reverse("blog:user-comment-list", args=[self.user.pk])
+
+        res = self.user2_client.get(compliments_url, {"pagination": "cursor", "page_size": 3})
+        self.assertEqual([comment['id'] for comment in res.data['results']], [
+            self.comment.pk, roots[0].pk, roots[1].pk,
+        ])
+        self.assertEqual(res.data['results'][2]['replies'][0]['id'], reply.pk)
+
+        res = self.user2_client.get(res.data['next'])
+        self.assertEqual([comment['id'] for comment in res.data['results']], [roots[2].pk])
+        self.assertIsNone(res.data['next'])
+
+    def test_comment_tree_serializer(self):
+        reply = self._create_comment(self.user, reply_to=self.comment)
+        self._create_comment(self.user, reply_to=reply)
+        self._create_comment(reply_to=self.comment)
+        self._create_comment(self.user)
+
+        trees = get_tree_backend().get_trees(Comment.objects.filter(**get_generic_kwargs(self.user)))
+        self.assertEqual(
+            CommentSerializer(trees, many=True).data,
+            RecursiveCommentSerializer(trees, many=True).data,
+        )
+
+        res = self.user2_client.get(comment_detail_url(self.comment.pk))
+        self.assertEqual(res.data['replies'], RecursiveCommentSerializer(trees[0]).data['replies'])
+        self.assertEqual(len(res.data['replies'][0]['replies']), 1)
+
+    def test_comment_reply_limits(self):
+        replies = [self._create_comment(self.user, reply_to=self.comment) for _ in range(3)]
+        nested = self._create_comment(self.user, reply_to=replies[0])
+        deepest = self._create_comment(self.user, reply_to=nested)
+        compliments_url = reverse("blog:user-comment-list", args=[self.user.pk])
+
+        def get_tree(comments):
+            return [(comment['id'], get_tree(comment['replies'])) for comment in comments]
+
+        res = self.user2_client.get(compliments_url)
+        self.assertNotIn('more_replies', res.data['results'][0])
+
+        res = self.user2_client.get(compliments_url, {"max_depth": 1, "max_replies": 2})
+        root = res.data['results'][0]
+        self.assertEqual(get_tree([root]), [
+            (self.comment.pk, [(replies[0].pk, []), (replies[1].pk, [])]),
+        ])
+        self.assertIsNone(root['replies'][1]['more_replies'])
+
+        res = self.user2_client.get(root['more_replies'])
+        self.assertEqual(get_tree(res.data['results']), [(replies[2].pk, [])])
+        self.assertIsNone(res.data['next'])
+
+        res = self.user2_client.get(root['replies'][0]['more_replies'])
+        self.assertEqual(get_tree(res.data['results']), [(nested.pk, [(deepest.pk, [])])])
+        self.assertIsNone(res.data['results'][0]['more_replies'])
+
+        res = self.user2_client.get(compliments_url, {"max_depth": -1})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_path_tree_backend(self):
+        compliments_url = reverse("blog:user-comment-list", args=[self.admin.pk])
+
+        def comment(reply_to=None):
+            data = {"text": 'Hellow', "reply_to": reply_to} if reply_to else {"text": 'Hellow'}
+            return self.user1_client.post(compliments_url, data).data['id']
+
+        with patch('social.settings.COMMENT_TREE_BACKEND', 'path'):
+            root = comment()
+            reply = comment(root)
+            comment(reply)
+            comment()
+            comment(root)
+
+            self.admin_client.delete(comment_detail_url(reply))
+            res = self.user2_client.get(compliments_url)
+            self.assertEqual(len(res.data['results'][0]['replies']), 1)
+            self.assertEqual(Comment.objects.filter(**get_generic_kwargs(self.admin)).count(), 3)
+            self.assertEqual(get_counts(**get_generic_kwargs(self.admin))['comments'], 3)
+
+            # Comments without cached replies are read with the backend too
+            data = CommentSerializer(Comment.objects.filter(pk=root), many=True).data
+            self.assertEqual(data, res.data['results'][:1])
+
+        call_command('rebuild_comment_trees', backend='mptt', stdout=open(os.devnull, 'w'))
+        self.assertEqual(self.user2_client.get(compliments_url).data, res.data)
+
+    def test_moderation_queue(self):
+        comments = [self.comment] + [self._create_comment(self.user) for _ in range(4)]
+        self._create_comment(self.user, is_accepted=True)
+        expected_ids = [comment.pk for comment in reversed(comments)]
+
+        ids, pages = [], []
+        url = reverse("social:comments-unaccepted") + "?page_size=2"
+        while url:
+            res = self.admin_client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            pages.append(res.data)
+            ids += [comment['id'] for comment in res.data['results']]
+            url = res.data['next']
+        self.assertEqual(ids, expected_ids)
+        self.assertEqual(len(pages), 3)
+
+        res = self.admin_client.get(pages[-1]['previous'])
+        self.assertEqual(res.data['results'], pages[1]['results'])
+
+        res = self.user1_client.get(reverse("social:comments-unaccepted"))
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_bulk_moderation(self):
+        reply = self._create_comment(self.user, reply_to=self.comment)
+        other = self._create_comment(self.user)
+        self._create_comment(self.user)
+        rebuild_counter(**get_generic_kwargs(self.user))
+
+        res = self.admin_client.post(reverse("social:comments-bulk-accept"),
+                                     {"ids": [self.comment.pk, other.pk]}, format='json')
+        self.assertEqual(res.data['count'], 2)
+        self.assertEqual(Comment.objects.filter(is_accepted=True).count(), 2)
+
+        res = self.admin_client.post(reverse("social:comments-bulk-hide"), {"ids": [other.pk]}, format='json')
+        self.assertEqual(res.data['count'], 1)
+        self.assertTrue(Comment.objects.get(pk=other.pk).hidden)
+
+        res = self.user1_client.post(reverse("social:comments-bulk-delete"), {"ids": [other.pk]}, format='json')
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+        res = self.admin_client.post(reverse("social:comments-bulk-delete"),
+                                     {"ids": [self.comment.pk, other.pk]}, format='json')
+        self.assertEqual(res.data['count'], 3)
+        self.assertFalse(Comment.objects.filter(pk__in=[self.comment.pk, reply.pk, other.pk]).exists())
+        self.assertEqual(get_counts(**get_generic_kwargs(self.user))['comments'], 1)
+
+    @patch('social.settings.COMMENT_CACHE_TTL', 60)
+    def test_thread_cache(self):
+        cache.clear()
+        compliments_url = reverse("blog:user-comment-list", args=[self.user.pk])
+        res = self.user2_client.get(compliments_url)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.user2_client.get(compliments_url).data, res.data)
+
+        res = self.user2_client.post(compliments_url, {"text": 'Hellow', "reply_to": self.comment.pk})
+        reply_id = res.data['id']
+        res = self.user2_client.get(compliments_url)
+        self.assertEqual(res.data['results'][0]['replies'][0]['id'], reply_id)
+
+        self.admin_client.patch(comment_detail_url(reply_id), {"text": 'Edited'})
+        res = self.user2_client.get(compliments_url)
+        self.assertEqual(res.data['results'][0]['replies'][0]['text'], 'Edited')
+
+        self.admin_client.post(reverse("social:comments-bulk-hide"), {"ids": [reply_id]}, format='json')
+        res = self.user2_client.get(compliments_url)
+        self.assertTrue(res.data['results'][0]['replies'][0]['hidden'])
+
+        self.admin_client.delete(comment_detail_url(reply_id))
+        res = self.user2_client.get(compliments_url)
+        self.assertEqual(res.data['results'][0]['replies'], [])
+
+    def test_comments_counter(self):
+        compliments_url = reverse("blog:user-comment-list", args=[self.admin.pk])
+        res = self.user1_client.post(compliments_url, {"text": 'Hellow'})
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.user1_client.post(compliments_url, {"text": 'Reply', "reply_to": res.data['id']})
+
+        counter = Counter.objects.get(object_id=self.admin.pk,
+                                      content_type=ContentType.objects.get_for_model(self.admin))
+        self.assertEqual(counter.comments, 2)
+
+        self.admin_client.delete(comment_detail_url(res.data['id']))
+        counter.refresh_from_db()
+        self.assertEqual(counter.comments, 0)
+
+    def test_reconcile_counters(self):
+        self._create_comment(self.user)
+        Counter.objects.all().delete()
+
+        call_command('reconcile_counters', stdout=open(os.devnull, 'w'))
+        counter = Counter.objects.get(object_id=self.user.pk,
+                                      content_type=ContentType.objects.get_for_model(self.user))
+        self.assertEqual(counter.comments, 2)
+
+    @patch('social.settings.COUNTER_SHARDS', 4)
+    def test_sharded_counters(self):
+        generic_kwargs = get_generic_kwargs(self.user)
+        rebuild_counter(**generic_kwargs)
+        for _ in range(20):
+            update_counter(**generic_kwargs, likes=1)
+
+        self.assertGreater(Counter.objects.filter(**generic_kwargs).count(), 1)
+        counts = get_counts(**generic_kwargs)
+        self.assertEqual(counts['likes'], 20)
+        self.assertEqual(counts['comments'], 1)
+
+        rebuild_counter(**generic_kwargs)
+        self.assertEqual(Counter.objects.filter(**generic_kwargs).count(), 1)
+        self.assertEqual(get_counts(**generic_kwargs)['likes'], 0)
+
+    @patch('social.settings.COUNTER_SHARDS', 4)
+    def test_counter_rebuild_race(self):
+        generic_kwargs = get_generic_kwargs(self.admin)
+        Like.objects.create(user=self.user, status=Like.statuses.LIKE, **generic_kwargs)
+        rebuild = rebuild_counter
+        conflicts = [IntegrityError]
+
+        def rebuild_after_conflict(*args):
+            if conflicts:
+                raise conflicts.pop()
+            return rebuild(*args)
+
+        # Another request builds the counter between the lookup and the rebuild
+        with patch('social.counters.rebuild_counter', side_effect=rebuild_after_conflict), \
+                patch('social.counters.random.randrange', return_value=2):
+            update_counter(**generic_kwargs, likes=1)
+        self.assertEqual(get_counts(**generic_kwargs)['likes'], 1)
+        self.assertEqual(Counter.objects.filter(**generic_kwargs).count(), 1)
+
+    def test_like_conflicts(self):
+        generic_kwargs = get_generic_kwargs(self.admin)
+
+        create = Like.objects.create
+        conflicts = [IntegrityError]
+
+        def create_after_conflict(**kwargs):
+            if conflicts:
+                raise conflicts.pop()
+            return create(**kwargs)
+
+        # Conflicts are retried once
+        with patch.object(Like.objects, 'create', side_effect=create_after_conflict):
+            self.assertTrue(set_like(self.user, **generic_kwargs, like_status=Like.statuses.LIKE))
+        self.assertEqual(get_counts(**generic_kwargs)['likes'], 1)
+
+        with patch.object(Like.objects, 'create', side_effect=IntegrityError) as create_mock, \
+                self.assertRaises(IntegrityError):
+            set_like(self.admin, **generic_kwargs, like_status=Like.statuses.LIKE)
+        self.assertEqual(create_mock.call_count, 2)
+
+        with patch.object(Like.objects, 'bulk_create', side_effect=IntegrityError) as bulk_create_mock, \
+                self.assertRaises(IntegrityError):
+            bulk_set_likes(self.admin, generic_kwargs['content_type'], {self.admin.pk: Like.statuses.LIKE})
+        self.assertEqual(bulk_create_mock.call_count, 2)
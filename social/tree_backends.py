@@ -0,0 +1,202 @@
+import string
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+
+from django.db.models import Q
+from mptt.models import MPTTModel
+from mptt.utils import get_cached_trees
+
+from social import settings as social_settings
+
+PATH_STEP_LENGTH = 7
+PATH_DIGITS = string.digits + string.ascii_lowercase
+MAX_LEVEL = 255 // PATH_STEP_LENGTH - 1
+"""Deepest level that fits in `Comment.path`"""
+
+
+def get_path_step(pk: int) -> str:
+    """Fixed length base 36 of pk, so paths sort like siblings were created"""
+    step = ''
+    while pk:
+        pk, digit = divmod(pk, len(PATH_DIGITS))
+        step = PATH_DIGITS[digit] + step
+    return step.rjust(PATH_STEP_LENGTH, '0')
+
+
+def rebuild_paths(model, batch_size: int = 1000) -> int:
+    """Set paths of all comments from their `reply_to`.
+
+    Returns number of comments.
+    """
+    paths = {}
+    comments = []
+    for pk, parent_id in model.objects.order_by('pk').values_list('pk', 'reply_to_id').iterator():
+        # Replies are always created after the comment they reply to
+        paths[pk] = paths.get(parent_id, '') + get_path_step(pk)
+        comments.append(model(pk=pk, path=paths[pk]))
+        if len(comments) >= batch_size:
+            model.objects.bulk_update(comments, ['path'])
+            comments = []
+
+    model.objects.bulk_update(comments, ['path'])
+    return len(paths)
+
+
+def build_trees(queryset, top_level: int = 0, max_depth: int = None, max_replies: int = None) -> list:
+    """Returns top comments of a tree ordered queryset with cached replies.
+
+    Replies deeper than `max_depth` levels below `top_level` and replies
+    after first `max_replies` of every comment are left out, and comments
+    with left out replies are marked with `replies_truncated`.
+    only pk, parent and level of comments are scanned to choose the kept ones.
+    """
+    if max_depth is None and max_replies is None:
+        return get_cached_trees(queryset)
+
+    rows = queryset
+    if max_depth is not None:
+        # One more level to know which comments have replies
+        rows = rows.filter(level__lte=top_level + max_depth + 1)
+
+    kept_ids = set()
+    truncated_ids = set()
+    replies_count = defaultdict(int)
+    for pk, parent_id, level in rows.values_list('pk', 'reply_to_id', 'level'):
+        if level == top_level:
+            kept_ids.add(pk)
+        elif parent_id not in kept_ids:
+            continue
+        elif (max_depth is not None and level > top_level + max_depth) or (
+                max_replies is not None and replies_count[parent_id] >= max_replies):
+            truncated_ids.add(parent_id)
+        else:
+            replies_count[parent_id] += 1
+            kept_ids.add(pk)
+
+    trees = get_cached_trees(queryset.filter(pk__in=kept_ids))
+    stack = list(trees)
+    while stack:
+        comment = stack.pop()
+        comment.replies_truncated = comment.pk in truncated_ids
+        stack.extend(comment._cached_children)
+    return trees
+
+
+class MPTTBackend:
+    """Nested sets of django-mptt.
+
+    Reads are range scans, but every insert shifts
+    `lft` and `rght` of the next nodes in the thread.
+    """
+    ordering = ['tree_id', 'lft']
+    root_key_field = 'tree_id'
+
+    def save(self, comment, save, *args, **kwargs):
+        adding = comment._state.adding
+        save(*args, **kwargs)
+        if adding:
+            self._set_path(comment)
+
+    def _set_path(self, comment):
+        parent = comment.reply_to
+        comment.path = (parent.path if parent else '') + get_path_step(comment.pk)
+        comment.__class__.objects.filter(pk=comment.pk).update(path=comment.path)
+
+    def delete(self, comment, *args, **kwargs):
+        return MPTTModel.delete(comment, *args, **kwargs)
+
+    def get_roots(self, queryset):
+        """Root comments ordered by their keys"""
+        return queryset.filter(reply_to__isnull=True).order_by(self.root_key_field)
+
+    def get_root_keys(self, queryset):
+        """Ordered keys of root comments, to paginate them"""
+        return self.get_roots(queryset).values_list(self.root_key_field, flat=True)
+
+    def _filter_root_keys(self, queryset, root_keys):
+        return queryset.filter(tree_id__in=root_keys)
+
+    def get_trees(self, queryset, root_keys=None, **limits) -> list:
+        """Root comments of the queryset with cached replies,
+        `limits` are passed to `build_trees`"""
+        if root_keys is not None:
+            queryset = self._filter_root_keys(queryset, root_keys)
+        return build_trees(queryset.order_by(*self.ordering), **limits)
+
+    def get_reply_trees(self, comments: list, **limits) -> list:
+        """Same as `get_trees` for some replies of a comment"""
+        if not comments:
+            return []
+        model = comments[0].__class__
+        queryset = self.get_subtrees(model.objects.filter(pk__in=[comment.pk for comment in comments]))
+        queryset = queryset.select_related('user').order_by(*self.ordering)
+        return build_trees(queryset, top_level=comments[0].level, **limits)
+
+    def get_descendant_trees(self, comment) -> list:
+        return comment.get_descendants().select_related('user').get_cached_trees()
+
+    def get_descendant_count(self, comment) -> int:
+        return comment.get_descendant_count()
+
+    def get_subtrees(self, queryset):
+        """Comments of the queryset and all of their replies"""
+        return queryset.model.objects.get_queryset_descendants(queryset, include_self=True)
+
+    def delete_subtrees(self, queryset):
+        tree_ids = set(queryset.values_list('tree_id', flat=True))
+        self.get_subtrees(queryset).delete()
+        # Close gaps of deleted nodes
+        for tree_id in tree_ids:
+            queryset.model.objects.partial_rebuild(tree_id)
+
+
+class MaterializedPathBackend(MPTTBackend):
+    """Every comment stores path of it's ancestors' pks.
+
+    Inserts write only the new row and nested sets are left stale.
+    """
+    ordering = ['path']
+    root_key_field = 'path'
+
+    def save(self, comment, save, *args, **kwargs):
+        with comment.__class__.objects.disable_mptt_updates():
+            if comment._state.adding:
+                # Level is set from the cached parent
+                comment.reply_to
+            super().save(comment, save, *args, **kwargs)
+
+    def delete(self, comment, *args, **kwargs):
+        # Replies are deleted too
+        return self._get_subtree(comment).delete()
+
+    def _get_subtree(self, comment):
+        return comment.__class__.objects.filter(path__startswith=comment.path)
+
+    def _filter_root_keys(self, queryset, root_keys):
+        return queryset.filter(reduce(
+            or_, [Q(path__startswith=path) for path in root_keys], Q(pk__in=[])
+        ))
+
+    def get_descendant_trees(self, comment) -> list:
+        descendants = self._get_subtree(comment).exclude(pk=comment.pk)
+        return get_cached_trees(descendants.order_by('path').select_related('user'))
+
+    def get_descendant_count(self, comment) -> int:
+        return self._get_subtree(comment).exclude(pk=comment.pk).count()
+
+    def get_subtrees(self, queryset):
+        return self._filter_root_keys(queryset.model.objects.all(), queryset.values_list('path', flat=True))
+
+    def delete_subtrees(self, queryset):
+        self.get_subtrees(queryset).delete()
+
+
+TREE_BACKENDS = {
+    'mptt': MPTTBackend(),
+    'path': MaterializedPathBackend(),
+}
+
+
+def get_tree_backend() -> MPTTBackend:
+    return TREE_BACKENDS[social_settings.COMMENT_TREE_BACKEND]
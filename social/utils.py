@@ -1,5 +1,12 @@
 
-from social.models import Like
+from hashlib import md5
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Count
+
+from core.versions import bump_version, get_version
+from social.counters import COUNTER_FIELDS
+from social.models import Comment, Counter, Like, TaggedItem
 
 
 def count_likes_by_status(likes: list[Like], status) -> int:
@@ -11,8 +18,103 @@ def count_likes_by_status(likes: list[Like], status) -> int:
 
 def liked_by_user(likes: list[Like], user) -> Like:
     like = list(filter(
-        lambda like: (like.user == user), likes
+        lambda like: (like.user_id == user.pk), likes
     ))
     if like:
         return like[0]
     return []
+
+
+def get_user_likes(objects: list, user) -> dict:
+    """Returns likes of `user` on `objects` keyed by object pk, in one query"""
+    if not objects:
+        return {}
+
+    return get_user_likes_by_ids(
+        ContentType.objects.get_for_model(objects[0].__class__),
+        [obj.pk for obj in objects],
+        user,
+    )
+
+
+def get_user_likes_by_ids(content_type, object_ids: list[int], user) -> dict:
+    """Same as `get_user_likes` when only ids of the objects are known"""
+    if not object_ids or not user.is_authenticated:
+        return {}
+
+    likes = Like.objects.filter(user=user, content_type=content_type, object_id__in=object_ids)
+    return {like.object_id: like for like in likes}
+
+
+def get_counter(instance, counter_field='counters') -> Counter:
+    """Returns sum of instance's counter shards (from prefetched
+    `counter_field` if it's prefetched) or `None`"""
+    counters = getattr(instance, counter_field, None)
+    if counters is None:
+        return None
+
+    shards = counters.all()
+    if len(shards) <= 1:
+        return next(iter(shards), None)
+
+    return Counter(**{
+        field: sum(getattr(shard, field) for shard in shards)
+        for field in COUNTER_FIELDS
+    })
+
+
+def get_missing_counters(objects: list, counter_field='counters') -> dict:
+    """Counters of `objects` that have no counter rows yet, counted
+    from raw tables in grouped queries and keyed by object pk"""
+    missing_ids = [obj.pk for obj in objects if get_counter(obj, counter_field) is None]
+    if not missing_ids:
+        return {}
+
+    lookup = {
+        "content_type": ContentType.objects.get_for_model(objects[0].__class__),
+        "object_id__in": missing_ids,
+    }
+    counters = {pk: Counter() for pk in missing_ids}
+    for oid, like_status, count in (Like.objects.filter(**lookup).values_list('object_id', 'status')
+                                    .annotate(count=Count('id')).order_by()):
+        field = 'likes' if like_status == Like.statuses.LIKE else 'dislikes'
+        setattr(counters[oid], field, count)
+    for oid, count in (Comment.objects.filter(**lookup).values_list('object_id')
+                       .annotate(count=Count('id')).order_by()):
+        counters[oid].comments = count
+    return counters
+
+
+def get_thread_version(content_type, object_id) -> str:
+    """Version stamp of a comment thread, that changes when the thread is invalidated"""
+    return get_version('comments', getattr(content_type, 'pk', content_type), object_id)
+
+
+def get_thread_cache_key(request, content_type, object_id) -> str:
+    """Cache key of a comment thread page, changes when the thread is invalidated"""
+    content_type_id = getattr(content_type, 'pk', content_type)
+    version = get_thread_version(content_type_id, object_id)
+    url_hash = md5(request.build_absolute_uri().encode()).hexdigest()
+    return f"comments:{content_type_id}:{object_id}:{version}:{url_hash}"
+
+
+def invalidate_thread(content_type, object_id):
+    bump_version('comments', getattr(content_type, 'pk', content_type), object_id)
+
+
+def get_tagged_object_ids(model, values: list, field: str = 'tag_id', match_all: bool = False):
+    """Subquery of ids of `model` objects that are tagged with any of `values`,
+    or all of them if `match_all` is `True`.
+
+    `field` is the tag field that values are compared with, like `tag__label`.
+    Use it in a `pk__in` lookup, so database runs it as a semi-join.
+    """
+    tagged_items = TaggedItem.objects.filter(
+        content_type=ContentType.objects.get_for_model(model),
+        **{f'{field}__in': values},
+    )
+    if match_all:
+        tagged_items = tagged_items.values('object_id').annotate(
+            matched=Count(field, distinct=True)
+        ).filter(matched=len(set(values)))
+    return tagged_items.values('object_id')
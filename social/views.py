@@ -1,4 +1,7 @@
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
 from django.db.models.query import QuerySet
 from django.http.response import Http404
 from drf_spectacular.utils import extend_schema, extend_schema_view
@@ -7,13 +10,22 @@ from rest_framework.decorators import permission_classes, action
 from rest_framework.response import Response
 from rest_framework.mixins import CreateModelMixin, ListModelMixin
 from rest_framework.viewsets import GenericViewSet
-from social.schemas import COMMENT_RESPONSE_NOREPLY, COMMENT_RESPONSE_PAGINATED, COMMENT_RESPONSE_RETRIEVE, COMMENT_UPDATE_ADMIN, COMMENT_UPDATE_USER
+from social.schemas import COMMENT_RESPONSE_CURSOR_PAGINATED, COMMENT_RESPONSE_PAGINATED, COMMENT_RESPONSE_RETRIEVE, COMMENT_UPDATE_ADMIN, COMMENT_UPDATE_USER
 
 from core.permissions import IsAdmin, IsAuthor, IsOwnerOfItem, IsReadOnly
+from core.mixins import ConditionalListMixin
+from core.paginations import KeysetPagination
 from core.utils import all_methods
-from core.paginations import DefaultLimitOffsetPagination
+from core.versions import bump_model_version
+from social import settings as social_settings
+from .counters import update_counter
+from .mixins import ReplyLimitsMixin
 from .models import Tag, Comment
-from .serializers import CommentAdminUpdateSerializer, CommentUpdateSerializer, TagSerializer, CommentSerializer
+from .paginations import CommentTreePagination, RepliesPagination
+from .tree_backends import get_tree_backend
+from .utils import get_thread_cache_key, get_thread_version, invalidate_thread
+from .serializers import (CommentAdminUpdateSerializer, CommentBulkSerializer, CommentTreeQuerySerializer,
+                          CommentUpdateSerializer, TagSerializer, CommentSerializer)
 
 
 @permission_classes([IsReadOnly | IsAuthor | IsAdmin])
@@ -27,7 +39,8 @@ class TagViewset(viewsets.ModelViewSet):
     partial_update=extend_schema(examples=[COMMENT_UPDATE_ADMIN, COMMENT_UPDATE_USER]),
 )
 @permission_classes([IsReadOnly | IsOwnerOfItem | IsAdmin])
-class CommentViewset(mixins.RetrieveModelMixin,
+class CommentViewset(ReplyLimitsMixin,
+                     mixins.RetrieveModelMixin,
                      mixins.UpdateModelMixin,
                      mixins.DestroyModelMixin,
                      viewsets.GenericViewSet):
@@ -40,12 +53,26 @@ class CommentViewset(mixins.RetrieveModelMixin,
         return self.queryset
 
     def get_serializer_class(self):
+        if self.action in ['bulk_accept', 'bulk_hide', 'bulk_delete']:
+            return CommentBulkSerializer
         if self.request.method == 'PATCH':
             if self.request.user.is_staff:
                 return CommentAdminUpdateSerializer
             return CommentUpdateSerializer
         return CommentSerializer
 
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        invalidate_thread(serializer.instance.content_type_id, serializer.instance.object_id)
+
+    def perform_destroy(self, instance):
+        # Replies will be deleted too
+        deleted_count = get_tree_backend().get_descendant_count(instance) + 1
+        super().perform_destroy(instance)
+        update_counter(instance.content_type, instance.object_id,
+                       comments=-deleted_count)
+        invalidate_thread(instance.content_type_id, instance.object_id)
+
     def destroy(self, req, *args, **kwargs):
         """if an admin deletes a comment, comment will delete. else, comment will hide"""
         if req.user.is_staff:
@@ -55,40 +82,115 @@ class CommentViewset(mixins.RetrieveModelMixin,
             if not comment.hidden:
                 comment.hidden = True
                 comment.save()
+                invalidate_thread(comment.content_type_id, comment.object_id)
             return Response(status=status.HTTP_204_NO_CONTENT)
 
-    @extend_schema(examples=[COMMENT_RESPONSE_NOREPLY])
-    @action(detail=False,
-            methods=all_methods('get', only_these=True),
-            permission_classes=[permissions.IsAdminUser]
-            )
-    def unaccepted(self, *args, **kwargs):
-        """Last sent comments that need to accept by admin"""
+    def _get_moderation_queue(self, **filters):
+        comments = Comment.objects.filter(**filters).select_related('user')
+        page = self.paginate_queryset(comments)
         serializer = self.get_serializer(
-            self.get_queryset().filter(is_accepted=False).order_by('-created_at'),
-            read_only=True,
+            page,
             context={'no-reply': True},
             many=True
         )
+        return self.get_paginated_response(serializer.data)
 
-        return Response(serializer.data)
+    @extend_schema(examples=[COMMENT_RESPONSE_CURSOR_PAGINATED])
+    @action(detail=False,
+            methods=all_methods('get', only_these=True),
+            permission_classes=[permissions.IsAdminUser],
+            pagination_class=KeysetPagination,
+            )
+    def unaccepted(self, *args, **kwargs):
+        """Last sent comments that need to accept by admin"""
+        return self._get_moderation_queue(is_accepted=False)
 
-    @extend_schema(examples=[COMMENT_RESPONSE_NOREPLY])
+    @extend_schema(examples=[COMMENT_RESPONSE_CURSOR_PAGINATED])
     @action(detail=False,
             methods=all_methods('get', only_these=True),
-            permission_classes=[permissions.IsAdminUser]
+            permission_classes=[permissions.IsAdminUser],
+            pagination_class=KeysetPagination,
             )
     def hidden(self, req, *args, **kwargs):
         """Last deleted comments by users"""
-        hidden_comments = self.get_queryset().filter(hidden=True).order_by('-created_at')
-        serializer = self.get_serializer_class()(
-            hidden_comments,
-            read_only=True,
-            context={'no-reply': True},
+        return self._get_moderation_queue(hidden=True)
+
+    @extend_schema(parameters=[CommentTreeQuerySerializer])
+    @action(detail=True,
+            methods=all_methods('get', only_these=True),
+            pagination_class=RepliesPagination,
+            )
+    def replies(self, *args, **kwargs):
+        """Replies of a comment with their trees, continues `more_replies` of truncated trees"""
+        comment = self.get_object()
+        page = self.paginate_queryset(Comment.objects.filter(reply_to=comment))
+        trees = get_tree_backend().get_reply_trees(page, **self.get_reply_limits())
+        serializer = self.get_serializer(
+            trees,
+            context={**self.get_serializer_context(), **self.get_reply_limits_context()},
             many=True
         )
+        return self.get_paginated_response(serializer.data)
+
+    def _get_bulk_comments(self):
+        serializer = self.get_serializer(data=self.request.data)
+        serializer.is_valid(raise_exception=True)
+        return Comment.objects.filter(pk__in=serializer.validated_data['ids'])
+
+    def _get_threads(self, comments) -> list:
+        return list(comments.values_list('content_type_id', 'object_id').distinct().order_by())
+
+    @action(detail=False,
+            methods=all_methods('post', only_these=True),
+            permission_classes=[permissions.IsAdminUser],
+            url_path='accept',
+            )
+    def bulk_accept(self, *args, **kwargs):
+        """Accept many comments at once"""
+        comments = self._get_bulk_comments().filter(is_accepted=False)
+        threads = self._get_threads(comments)
+        count = comments.update(is_accepted=True)
+        bump_model_version(Comment)
+        for content_type_id, object_id in threads:
+            invalidate_thread(content_type_id, object_id)
+        return Response({"count": count})
+
+    @action(detail=False,
+            methods=all_methods('post', only_these=True),
+            permission_classes=[permissions.IsAdminUser],
+            url_path='hide',
+            )
+    def bulk_hide(self, *args, **kwargs):
+        """Hide many comments at once"""
+        comments = self._get_bulk_comments().filter(hidden=False)
+        threads = self._get_threads(comments)
+        count = comments.update(hidden=True)
+        bump_model_version(Comment)
+        for content_type_id, object_id in threads:
+            invalidate_thread(content_type_id, object_id)
+        return Response({"count": count})
+
+    @action(detail=False,
+            methods=all_methods('post', only_these=True),
+            permission_classes=[permissions.IsAdminUser],
+            url_path='delete',
+            )
+    def bulk_delete(self, *args, **kwargs):
+        """Delete many comments and their replies at once"""
+        comments = self._get_bulk_comments()
+        backend = get_tree_backend()
 
-        return Response(serializer.data)
+        with transaction.atomic():
+            deleted = (backend.get_subtrees(comments)
+                       .values_list('content_type_id', 'object_id')
+                       .annotate(count=Count('id')).order_by())
+            deleted = list(deleted)
+            backend.delete_subtrees(comments)
+            for content_type_id, object_id, count in deleted:
+                update_counter(content_type_id, object_id, comments=-count)
+                invalidate_thread(content_type_id, object_id)
+
+        return Response({"count": sum(count for *_, count in deleted)})
 
 
 @extend_schema_view(
@@ -101,7 +203,9 @@ class CommentViewset(mixins.RetrieveModelMixin,
             "otherwise. the entered name and email will save "
         ), examples=[COMMENT_RESPONSE_RETRIEVE])
 )
-class ListCreateCommentsViewset(ListModelMixin, CreateModelMixin, GenericViewSet):
+@extend_schema_view(list=extend_schema(parameters=[CommentTreeQuerySerializer]))
+class ListCreateCommentsViewset(ConditionalListMixin, ReplyLimitsMixin,
+                                ListModelMixin, CreateModelMixin, GenericViewSet):
     # You should set `get_content_type`
     # and `object_id_lookup_url`
     # in your subclasses
@@ -120,7 +224,7 @@ class ListCreateCommentsViewset(ListModelMixin, CreateModelMixin, GenericViewSet
         return None
 
     serializer_class = CommentSerializer
-    pagination_class = DefaultLimitOffsetPagination
+    pagination_class = CommentTreePagination
 
     def _get_oid(self):
         if not self._oid:
@@ -137,19 +241,37 @@ class ListCreateCommentsViewset(ListModelMixin, CreateModelMixin, GenericViewSet
 
     def get_queryset(self):
         queryset = self.queryset
-        if not queryset:
+        if queryset is None:
             queryset = Comment.objects.filter(
                 content_type=self.get_content_type(),
                 object_id=self._get_oid(),
             ).prefetch_related("user")
 
-        queryset = queryset.all()
+        return queryset.all()
+
+    def get_version_stamps(self) -> list[str]:
+        return [get_thread_version(self.get_content_type(), self._get_oid())]
+
+    def list(self, request, *args, **kwargs):
+        ttl = social_settings.COMMENT_CACHE_TTL
+        if not ttl:
+            return super().list(request, *args, **kwargs)
+
+        cache_key = get_thread_cache_key(request, self.get_content_type(), self._get_oid())
+        if (data := cache.get(cache_key)) is None:
+            data = super().list(request, *args, **kwargs).data
+            cache.set(cache_key, data, ttl)
+        return Response(data)
 
-        return queryset.get_cached_trees()
+    def paginate_queryset(self, queryset):
+        if self.paginator is None:
+            return get_tree_backend().get_trees(queryset, **self.get_reply_limits())
+        return super().paginate_queryset(queryset)
 
     def get_serializer_context(self):
         return {
             **super().get_serializer_context(),
+            **(self.get_reply_limits_context() if self.action == 'list' else {}),
             'object_id': self._get_oid(),
             'content_type': self.get_content_type(),
         }
@@ -167,3 +289,5 @@ class ListCreateCommentsViewset(ListModelMixin, CreateModelMixin, GenericViewSet
         serializer.save(
             **data
         )
+        update_counter(data["content_type"], data["object_id"], comments=1)
+        invalidate_thread(data["content_type"], data["object_id"])
@@ -0,0 +1,79 @@
+import math
+import threading
+import time
+from hashlib import blake2b
+
+from viewcount import settings as viewcount_settings
+
+
+class BloomFilter:
+    """Set-like structure without false negatives and
+    with `error_rate` false positives when it holds `capacity` items"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray(math.ceil(self.size / 8))
+
+    def _get_indexes(self, key: str):
+        digest = blake2b(key.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'big'), int.from_bytes(digest[8:], 'big')
+        for i in range(self.hash_count):
+            yield (first + i * second) % self.size
+
+    def add(self, key: str):
+        for index in self._get_indexes(key):
+            self.bits[index >> 3] |= 1 << (index & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(
+            self.bits[index >> 3] & (1 << (index & 7))
+            for index in self._get_indexes(key)
+        )
+
+
+class RotatingBloomFilter:
+    """Remembers keys that added in last `window` to `2 * window` seconds.
+
+    Keeps two generations of filters and replaces
+    the older one with an empty filter every `window` seconds.
+    """
+
+    def __init__(self, window: float, capacity: int, error_rate: float):
+        self.window = window
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._lock = threading.Lock()
+        self.clear()
+
+    def _new_filter(self) -> BloomFilter:
+        return BloomFilter(self.capacity, self.error_rate)
+
+    def clear(self):
+        self._current = self._new_filter()
+        self._previous = self._new_filter()
+        self._rotated_at = time.monotonic()
+
+    def _rotate_if_expired(self):
+        now = time.monotonic()
+        if now - self._rotated_at >= self.window:
+            expired_windows = (now - self._rotated_at) // self.window
+            self._previous = self._current if expired_windows == 1 else self._new_filter()
+            self._current = self._new_filter()
+            self._rotated_at = now
+
+    def check_and_add(self, key: str) -> bool:
+        """Add key and returns `True` if it was seen before"""
+        with self._lock:
+            self._rotate_if_expired()
+            if key in self._current or key in self._previous:
+                return True
+            self._current.add(key)
+            return False
+
+
+recent_views = RotatingBloomFilter(
+    window=viewcount_settings.DEDUPE_WINDOW,
+    capacity=viewcount_settings.DEDUPE_CAPACITY,
+    error_rate=viewcount_settings.DEDUPE_ERROR_RATE,
+)
@@ -0,0 +1,158 @@
+import atexit
+import logging
+import threading
+from collections import Counter, defaultdict
+
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+
+from social.counters import update_counter
+from viewcount import settings as viewcount_settings
+from viewcount.models import View
+from viewcount.sketches import get_visitor_key, merge_sketch, new_sketch
+
+logger = logging.getLogger(__name__)
+
+
+class ViewBuffer:
+    """In-process write-behind queue for views.
+
+    Views are deduplicated by (content_type, object_id, user, visitor) until
+    the next flush, then written with a single `bulk_create`.
+    Viewer sketches are collected in memory and merged into stored sketches
+    on flush too, even if views aren't buffered.
+    Pending views are lost if the process gets killed before a flush.
+    """
+
+    def __init__(self, max_size: int, flush_interval: float):
+        self.max_size = max_size
+        self.flush_interval = flush_interval
+        self._pending = {}
+        self._sketches = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def _make_key(content_type_id: int, object_id: int, user_id, visitor) -> tuple:
+        return (content_type_id, object_id, user_id, visitor)
+
+    def add(self, content_type, object_id: int, user, ip: str, visitor: str = None) -> bool:
+        """Queue a view and returns `True` if it was not
+        queued before in current flush window"""
+        key = self._make_key(content_type.pk, object_id, getattr(user, 'pk', None), visitor)
+        if viewcount_settings.SKETCHES:
+            self.add_sketch(content_type.pk, object_id, get_visitor_key(user, visitor))
+
+        with self._lock:
+            if key in self._pending:
+                return False
+            self._pending[key] = (ip, timezone.now())
+            is_full = len(self._pending) >= self.max_size
+
+        if is_full:
+            self._wakeup.set()
+        return True
+
+    def add_sketch(self, content_type_id: int, object_id: int, visitor_key: str):
+        """Add a viewer to today's sketch of the object, that's merged on next flush"""
+        sketch_key = (content_type_id, object_id, timezone.localdate())
+        with self._lock:
+            if sketch_key not in self._sketches:
+                self._sketches[sketch_key] = new_sketch()
+            self._sketches[sketch_key].add(visitor_key)
+
+    def __len__(self):
+        return len(self._pending)
+
+    def drain(self) -> tuple[dict, dict]:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            sketches, self._sketches = self._sketches, {}
+        return pending, sketches
+
+    def flush(self) -> list[View]:
+        """Write pending views to database and returns created views.
+
+        Views of users who viewed the object before won't be created.
+        """
+        with self._flush_lock:
+            pending, sketches = self.drain()
+            for (content_type_id, object_id, day), sketch in sketches.items():
+                merge_sketch(content_type_id, object_id, day, sketch)
+
+            if not pending:
+                return []
+
+            # Only past views of pending viewers are checked, not whole history of the objects
+            viewers = defaultdict(lambda: (set(), set()))
+            for content_type_id, object_id, user_id, visitor in pending:
+                user_ids, visitors = viewers[content_type_id, object_id]
+                if user_id is not None:
+                    user_ids.add(user_id)
+                if visitor is not None:
+                    visitors.add(visitor)
+
+            query = Q(pk__in=[])
+            for (content_type_id, object_id), (user_ids, visitors) in viewers.items():
+                query |= Q(content_type_id=content_type_id, object_id=object_id) & (
+                    Q(user_id__in=user_ids) | Q(visitor__in=visitors)
+                )
+
+            existing = set(View.objects.filter(query).values_list(
+                'content_type_id', 'object_id', 'user_id', 'visitor'
+            ))
+
+            views = [
+                View(content_type_id=content_type_id, object_id=object_id,
+                     user_id=user_id, visitor=visitor, ip=ip, created_at=created_at)
+                for (content_type_id, object_id, user_id, visitor), (ip, created_at) in pending.items()
+                if (content_type_id, object_id, user_id, visitor) not in existing
+            ]
+            views = View.objects.bulk_create(views)
+
+            created_counts = Counter(
+                (view.content_type_id, view.object_id) for view in views
+            )
+            for (content_type_id, object_id), count in created_counts.items():
+                update_counter(content_type_id, object_id, views=count)
+
+            return views
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Flushing buffered views failed")
+            finally:
+                connection.close()
+
+    def start(self):
+        """Starts background flusher thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name='viewcount-flusher', daemon=True
+            )
+            self._thread.start()
+            atexit.register(self.flush)
+
+
+view_buffer = ViewBuffer(
+    max_size=viewcount_settings.BUFFER_MAX_SIZE,
+    flush_interval=viewcount_settings.BUFFER_FLUSH_INTERVAL,
+)
+
+
+def start_flusher():
+    """Starts background flusher of `view_buffer` if views are buffered or sketched.
+
+    It's called in server entry points (`wsgi.py` and `asgi.py`), so management
+    commands like `migrate` don't start a flusher.
+    """
+    if viewcount_settings.BUFFERED or viewcount_settings.SKETCHES:
+        view_buffer.start()
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from viewcount import settings as viewcount_settings
+from viewcount.rollups import prune_views, rollup_views
+
+
+class Command(BaseCommand):
+    help = (
+        "Aggregate views into hourly and daily rollups, "
+        "then delete rolled up views older than retention days"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--retention-days', type=int, default=viewcount_settings.RAW_RETENTION_DAYS)
+        parser.add_argument('--no-prune', action='store_true', help="Don't delete old views")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        count = rollup_views(batch_size=batch_size)
+        self.stdout.write(self.style.SUCCESS(f"{count} hourly rollups created"))
+
+        if not options['no_prune']:
+            count = prune_views(options['retention_days'], batch_size=batch_size)
+            self.stdout.write(self.style.SUCCESS(f"{count} old views deleted"))
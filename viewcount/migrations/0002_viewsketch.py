@@ -0,0 +1,29 @@
+# Generated by Django 3.2.9 on 2026-10-18 18:06
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('viewcount', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ViewSketch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('registers', models.BinaryField()),
+                ('object_id', models.PositiveIntegerField()),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='viewsketch',
+            constraint=models.UniqueConstraint(fields=('content_type', 'object_id', 'day'), name='unique_view_sketch_day'),
+        ),
+    ]
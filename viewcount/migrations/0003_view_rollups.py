@@ -0,0 +1,49 @@
+# Generated by Django 3.2.9 on 2026-10-18 18:08
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('viewcount', '0002_viewsketch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='view',
+            name='created_at',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now),
+        ),
+        migrations.CreateModel(
+            name='HourlyViewRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.DateTimeField()),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('object_id', models.PositiveIntegerField()),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailyViewRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('object_id', models.PositiveIntegerField()),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='hourlyviewrollup',
+            constraint=models.UniqueConstraint(fields=('content_type', 'object_id', 'bucket'), name='unique_hourly_view_rollup'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyviewrollup',
+            constraint=models.UniqueConstraint(fields=('content_type', 'object_id', 'day'), name='unique_daily_view_rollup'),
+        ),
+    ]
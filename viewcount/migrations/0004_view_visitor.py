@@ -0,0 +1,26 @@
+# Generated by Django 3.2.9 on 2026-10-18 18:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('viewcount', '0003_view_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='view',
+            name='visitor',
+            field=models.CharField(help_text="Hash of guest's IP and user agent", max_length=32, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='view',
+            index=models.Index(fields=['content_type', 'object_id', 'user'], name='viewcount_v_content_365df5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='view',
+            index=models.Index(fields=['content_type', 'object_id', 'visitor'], name='viewcount_v_content_427623_idx'),
+        ),
+    ]
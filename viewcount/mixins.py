@@ -1,9 +1,22 @@
 
 from django.db.models.base import Model
 from django.contrib.contenttypes.models import ContentType
+from drf_spectacular.utils import extend_schema
+from rest_framework.decorators import action
+from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 from ipware import get_client_ip
+from core.utils import all_methods
+from social.counters import get_counts, update_counter
+from viewcount import settings as viewcount_settings
+from viewcount.bloom import recent_views
+from viewcount.buffer import view_buffer
 from viewcount.models import View
+from viewcount.rollups import count_views, get_view_series
+from viewcount.serializers import (ViewSeriesQuerySerializer, ViewSeriesSerializer,
+                                   ViewStatsQuerySerializer, ViewStatsSerializer)
+from viewcount.sketches import estimate_unique_viewers, get_visitor_key
+from viewcount.utils import get_anonymous_visitor, get_view_counts
 
 
 class ViewCountMixin():
@@ -22,9 +35,15 @@ class ViewCountMixin():
         return self._generic_kwargs
 
     def get_view_count(self) -> int:
-        """Count model instance views in database"""
+        """Read model instance views from it's counter,
+        or count them in database if it has no counter"""
         if self._view_count is None:
-            self._view_count = View.objects.filter(**self._get_generic_kwargs()).count()
+            generic_kwargs = self._get_generic_kwargs()
+            if counts := get_counts(**generic_kwargs):
+                self._view_count = counts['views']
+            else:
+                self._view_count = count_views(generic_kwargs['content_type'].pk,
+                                               generic_kwargs['object_id'])
 
         return self._view_count
 
@@ -34,24 +53,44 @@ class ViewCountMixin():
 
         this is not very accurate. different users with same IP will
         be counted but one user with different IP will be counted once.
+        guests are identified by their IP and user agent.
         """
         ip, routable = get_client_ip(self.request)
         user = self.request.user if self.request.user.is_authenticated else None
+        visitor = None
+        if not user:
+            visitor = get_anonymous_visitor(ip, self.request.META.get('HTTP_USER_AGENT', ''))
 
-        # if user:
-        #     data = {"user": user,
-        #             "defaults": {"ip": ip}
-        #             }
-        # else:
-        #     data = {"ip": ip}
-        data = {"user": user,
-                "defaults": {"ip": ip}
-                }
+        generic_kwargs = self._get_generic_kwargs()
+        visitor_key = get_visitor_key(user, visitor)
+
+        if viewcount_settings.DEDUPE and recent_views.check_and_add(
+            f"{generic_kwargs['content_type'].pk}:{generic_kwargs['object_id']}:{visitor_key}"
+        ):
+            # Visitor viewed it recently, so it's counted before
+            return self.get_view_count()
+
+        if viewcount_settings.SKETCHES and not viewcount_settings.BUFFERED:
+            # Sketch is merged by `view_buffer` on next flush,
+            # so requests don't lock the stored sketch
+            view_buffer.add_sketch(generic_kwargs['content_type'].pk, generic_kwargs['object_id'], visitor_key)
+
+        if viewcount_settings.BUFFERED:
+            # View will be written by `view_buffer`, so count
+            # won't include it until next flush.
+            self._is_user_first_view = view_buffer.add(
+                user=user, ip=ip, visitor=visitor, **generic_kwargs
+            )
+            return self.get_view_count()
 
         view, created = View.objects.get_or_create(
-            **(data | self._get_generic_kwargs())
+            user=user, visitor=visitor,
+            defaults={"ip": ip},
+            **generic_kwargs
         )
         self._is_user_first_view = created
+        if created:
+            update_counter(views=1, **generic_kwargs)
 
         return self.get_view_count()
 
@@ -64,3 +103,57 @@ class ViewCountMixin():
     def retrieve(self, request, *args, **kwargs):
         self.count_view()
         return super().retrieve(request, *args, **kwargs)
+
+    @extend_schema(parameters=[ViewStatsQuerySerializer], responses=ViewStatsSerializer)
+    @action(detail=True,
+            methods=all_methods('get', only_these=True),
+            url_path='views')
+    def view_stats(self, request, *args, **kwargs):
+        """Exact view count and approximate unique viewers of last days"""
+        query = ViewStatsQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        days = query.validated_data['days']
+
+        generic_kwargs = self._get_generic_kwargs()
+        serializer = ViewStatsSerializer({
+            "view_count": self.get_view_count(),
+            "unique_viewers": estimate_unique_viewers(
+                generic_kwargs['content_type'].pk,
+                generic_kwargs['object_id'],
+                days=days
+            ),
+            "days": days,
+        })
+        return Response(serializer.data)
+
+    @extend_schema(parameters=[ViewSeriesQuerySerializer], responses=ViewSeriesSerializer(many=True))
+    @action(detail=True,
+            methods=all_methods('get', only_these=True),
+            url_path='views/series')
+    def view_series(self, request, *args, **kwargs):
+        """Views per hour or day of last days"""
+        query = ViewSeriesQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+
+        generic_kwargs = self._get_generic_kwargs()
+        series = get_view_series(
+            generic_kwargs['content_type'].pk,
+            generic_kwargs['object_id'],
+            **query.validated_data
+        )
+        return Response(ViewSeriesSerializer(series, many=True).data)
+
+
+class ViewCountListMixin:
+    """Adds view count of paginated objects to serializer context"""
+    _page = None
+
+    def paginate_queryset(self, queryset):
+        self._page = super().paginate_queryset(queryset)
+        return self._page
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self._page is not None:
+            context["view_counts"] = get_view_counts(self._page)
+        return context
@@ -4,8 +4,13 @@ from django.contrib.contenttypes.models import ContentType
 from django.db import models
 from django.db.models.base import Model
 from django.db.models.deletion import CASCADE, SET_NULL
-from django.db.models.fields import GenericIPAddressField, PositiveIntegerField
+from django.db.models.constraints import UniqueConstraint
+from django.db.models.fields import (BinaryField, CharField, DateField, DateTimeField,
+                                     GenericIPAddressField, PositiveIntegerField)
+from django.utils import timezone
 from django.db.models.fields.related import ForeignKey
+from django.db.models.indexes import Index
+from django.utils.translation import gettext_lazy as _
 
 User = settings.AUTH_USER_MODEL
 
@@ -13,7 +18,63 @@ User = settings.AUTH_USER_MODEL
 class View(Model):
     user = ForeignKey(to=User, on_delete=SET_NULL, null=True)
     ip = GenericIPAddressField(unpack_ipv4=True)
+    visitor = CharField(
+        max_length=32, null=True,
+        help_text=_("Hash of guest's IP and user agent"),
+    )
+    created_at = DateTimeField(default=timezone.now, db_index=True)
 
     content_type = ForeignKey(to=ContentType, on_delete=CASCADE)
     object_id = PositiveIntegerField()
     content_object = GenericForeignKey()
+
+    class Meta:
+        indexes = [
+            Index(fields=['content_type', 'object_id', 'user']),
+            Index(fields=['content_type', 'object_id', 'visitor']),
+        ]
+
+
+class ViewSketch(Model):
+    """HyperLogLog registers of an object's viewers in a day"""
+    day = DateField()
+    registers = BinaryField()
+
+    content_type = ForeignKey(to=ContentType, on_delete=CASCADE)
+    object_id = PositiveIntegerField()
+    content_object = GenericForeignKey()
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(fields=['content_type', 'object_id', 'day'], name='unique_view_sketch_day'),
+        ]
+
+
+class HourlyViewRollup(Model):
+    """Count of views that created in an hour"""
+    bucket = DateTimeField()
+    views = PositiveIntegerField(default=0)
+
+    content_type = ForeignKey(to=ContentType, on_delete=CASCADE)
+    object_id = PositiveIntegerField()
+    content_object = GenericForeignKey()
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(fields=['content_type', 'object_id', 'bucket'], name='unique_hourly_view_rollup'),
+        ]
+
+
+class DailyViewRollup(Model):
+    """Count of views that created in a day, built from hourly rollups"""
+    day = DateField()
+    views = PositiveIntegerField(default=0)
+
+    content_type = ForeignKey(to=ContentType, on_delete=CASCADE)
+    object_id = PositiveIntegerField()
+    content_object = GenericForeignKey()
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(fields=['content_type', 'object_id', 'day'], name='unique_daily_view_rollup'),
+        ]
@@ -0,0 +1,169 @@
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Count, Max, Sum
+from django.db.models.functions import TruncDate, TruncDay, TruncHour
+from django.utils import timezone
+
+from viewcount import settings as viewcount_settings
+from viewcount.models import DailyViewRollup, HourlyViewRollup, View
+
+INTERVALS = ['hour', 'day']
+
+
+def get_rolled_until() -> datetime:
+    """Views created before this time are counted in rollups"""
+    last_bucket = HourlyViewRollup.objects.aggregate(last=Max('bucket'))['last']
+    if last_bucket:
+        return last_bucket + timedelta(hours=1)
+    return None
+
+
+def get_unrolled_views(rolled_until: datetime = None):
+    if rolled_until is None:
+        rolled_until = get_rolled_until()
+
+    views = View.objects.all()
+    if rolled_until:
+        views = views.filter(created_at__gte=rolled_until)
+    return views
+
+
+def rollup_views(now: datetime = None, batch_size: int = 1000) -> int:
+    """Aggregate views of finished hours into hourly and daily rollups.
+
+    Returns number of created hourly rollups.
+    """
+    now = now or timezone.now()
+    end = (now - timedelta(seconds=viewcount_settings.ROLLUP_DELAY)).replace(
+        minute=0, second=0, microsecond=0
+    )
+
+    with transaction.atomic():
+        hourly = (get_unrolled_views().filter(created_at__lt=end)
+                  .annotate(bucket=TruncHour('created_at'))
+                  .values_list('content_type_id', 'object_id', 'bucket')
+                  .annotate(views=Count('id')).order_by())
+
+        rollups = HourlyViewRollup.objects.bulk_create([
+            HourlyViewRollup(content_type_id=ctype_id, object_id=oid, bucket=bucket, views=views)
+            for ctype_id, oid, bucket, views in hourly
+        ], batch_size=batch_size)
+
+        days = {timezone.localdate(rollup.bucket) for rollup in rollups}
+        if days:
+            _rebuild_daily_rollups(days, batch_size)
+
+    return len(rollups)
+
+
+def _rebuild_daily_rollups(days: set, batch_size: int):
+    daily = (HourlyViewRollup.objects
+             .annotate(day=TruncDate('bucket'))
+             .filter(day__in=days)
+             .values_list('content_type_id', 'object_id', 'day')
+             .annotate(views=Sum('views')).order_by())
+
+    DailyViewRollup.objects.filter(day__in=days).delete()
+    DailyViewRollup.objects.bulk_create([
+        DailyViewRollup(content_type_id=ctype_id, object_id=oid, day=day, views=views)
+        for ctype_id, oid, day, views in daily
+    ], batch_size=batch_size)
+
+
+def prune_views(retention_days: int = None, now: datetime = None, batch_size: int = 1000) -> int:
+    """Delete rolled up views older than `retention_days`.
+
+    Returns number of deleted views.
+    """
+    if retention_days is None:
+        retention_days = viewcount_settings.RAW_RETENTION_DAYS
+
+    rolled_until = get_rolled_until()
+    if not rolled_until:
+        return 0
+
+    now = now or timezone.now()
+    cutoff = min(now - timedelta(days=retention_days), rolled_until)
+    old_views = View.objects.filter(created_at__lt=cutoff)
+
+    deleted_count = 0
+    while ids := list(old_views.values_list('pk', flat=True)[:batch_size]):
+        deleted, _ = View.objects.filter(pk__in=ids).delete()
+        deleted_count += deleted
+    return deleted_count
+
+
+def count_views(content_type_id: int, object_id: int) -> int:
+    """Count views of an object from rollups and not rolled up views"""
+    rolled = DailyViewRollup.objects.filter(
+        content_type_id=content_type_id, object_id=object_id
+    ).aggregate(views=Sum('views'))['views'] or 0
+
+    return rolled + get_unrolled_views().filter(
+        content_type_id=content_type_id, object_id=object_id
+    ).count()
+
+
+def count_views_bulk(content_type_id: int, object_ids: list[int]) -> dict:
+    """Count views of many objects of a model, keyed by object id"""
+    lookup = {"content_type_id": content_type_id, "object_id__in": object_ids}
+    totals = dict(
+        DailyViewRollup.objects.filter(**lookup)
+        .values_list('object_id').annotate(views=Sum('views')).order_by()
+    )
+
+    for oid, views in (get_unrolled_views().filter(**lookup)
+                       .values_list('object_id').annotate(views=Count('id')).order_by()):
+        totals[oid] = totals.get(oid, 0) + views
+    return totals
+
+
+def count_all_views() -> dict:
+    """Returns views count of all objects, keyed by (content_type_id, object_id)"""
+    generic_fields = ('content_type_id', 'object_id')
+    totals = {
+        (ctype_id, oid): views
+        for ctype_id, oid, views in (DailyViewRollup.objects.values_list(*generic_fields)
+                                     .annotate(views=Sum('views')).order_by())
+    }
+
+    for ctype_id, oid, views in (get_unrolled_views().values_list(*generic_fields)
+                                 .annotate(views=Count('id')).order_by()):
+        totals[ctype_id, oid] = totals.get((ctype_id, oid), 0) + views
+    return totals
+
+
+def get_view_series(content_type_id: int, object_id: int, interval: str = 'day', days: int = 7) -> list[dict]:
+    """Returns views of an object per `interval` in last `days` days.
+
+    Not rolled up views are aggregated from views table.
+    """
+    now = timezone.now()
+    today = timezone.localdate(now)
+    start = timezone.make_aware(datetime.combine(today - timedelta(days=days - 1), time.min))
+    lookup = {"content_type_id": content_type_id, "object_id": object_id}
+
+    if interval == 'hour':
+        rolled = HourlyViewRollup.objects.filter(bucket__gte=start, **lookup).values_list('bucket', 'views')
+        trunc = TruncHour
+    else:
+        rolled = [
+            (timezone.make_aware(datetime.combine(day, time.min)), views)
+            for day, views in DailyViewRollup.objects.filter(
+                day__gte=start.date(), **lookup
+            ).values_list('day', 'views')
+        ]
+        trunc = TruncDay
+
+    series = dict(rolled)
+    unrolled = (get_unrolled_views().filter(created_at__gte=start, **lookup)
+                .annotate(bucket=trunc('created_at'))
+                .values_list('bucket').annotate(views=Count('id')).order_by())
+    for bucket, views in unrolled:
+        series[bucket] = series.get(bucket, 0) + views
+
+    return [
+        {"start": bucket, "views": views}
+        for bucket, views in sorted(series.items())
+    ]
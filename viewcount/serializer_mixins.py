@@ -1,5 +1,8 @@
 class ViewCountSerializerMixin:
     def get_view_count(self, obj) -> int:
+        if (view_counts := self.context.get("view_counts")) is not None:
+            # Batched counts of a page of objects
+            return view_counts.get(obj.pk, 0)
         if count := self.context.get("view_count"):
             return count
         return 0
@@ -0,0 +1,23 @@
+from rest_framework import serializers
+
+from viewcount.rollups import INTERVALS
+
+
+class ViewStatsQuerySerializer(serializers.Serializer):
+    days = serializers.IntegerField(min_value=1, max_value=365, default=7)
+
+
+class ViewStatsSerializer(serializers.Serializer):
+    view_count = serializers.IntegerField(help_text="Exact count of unique viewers")
+    unique_viewers = serializers.IntegerField(help_text="Approximate unique viewers of last `days` days")
+    days = serializers.IntegerField()
+
+
+class ViewSeriesQuerySerializer(serializers.Serializer):
+    interval = serializers.ChoiceField(choices=INTERVALS, default='day')
+    days = serializers.IntegerField(min_value=1, max_value=365, default=7)
+
+
+class ViewSeriesSerializer(serializers.Serializer):
+    start = serializers.DateTimeField(help_text="Start of hour or day")
+    views = serializers.IntegerField()
@@ -0,0 +1,47 @@
+from django.conf import settings
+
+BUFFERED = getattr(settings, 'VIEWCOUNT_BUFFERED', False)
+"""
+If `True`, views are queued in memory and written
+in batches instead of one `get_or_create` per request.
+"""
+
+BUFFER_MAX_SIZE = getattr(settings, 'VIEWCOUNT_BUFFER_MAX_SIZE', 1000)
+"""Pending views count that triggers a flush before the interval ends"""
+
+BUFFER_FLUSH_INTERVAL = getattr(settings, 'VIEWCOUNT_BUFFER_FLUSH_INTERVAL', 5)
+"""Seconds between background flushes"""
+
+SKETCHES = getattr(settings, 'VIEWCOUNT_SKETCHES', False)
+"""
+If `True`, unique viewers of every object are estimated
+per day with HyperLogLog sketches too. sketches are collected
+in memory and merged every `BUFFER_FLUSH_INTERVAL` seconds.
+"""
+
+SKETCH_PRECISION = getattr(settings, 'VIEWCOUNT_SKETCH_PRECISION', 12)
+"""Sketches take `2 ** SKETCH_PRECISION` bytes"""
+
+RAW_RETENTION_DAYS = getattr(settings, 'VIEWCOUNT_RAW_RETENTION_DAYS', 90)
+"""
+Rolled up views older than this will be deleted by `rollup_views`.
+users who viewed an object before that will be counted again.
+"""
+
+ROLLUP_DELAY = getattr(settings, 'VIEWCOUNT_ROLLUP_DELAY', 300)
+"""Seconds to wait for in-flight views before rolling up an hour"""
+
+DEDUPE = getattr(settings, 'VIEWCOUNT_DEDUPE', True)
+"""
+If `True`, repeated views of a visitor are absorbed in memory
+and don't reach database. first views may rarely be absorbed
+too (`DEDUPE_ERROR_RATE` of them when filter is full)
+"""
+
+DEDUPE_WINDOW = getattr(settings, 'VIEWCOUNT_DEDUPE_WINDOW', 600)
+"""Seconds that a visitor's views are remembered (up to twice of it)"""
+
+DEDUPE_CAPACITY = getattr(settings, 'VIEWCOUNT_DEDUPE_CAPACITY', 100000)
+"""Expected views in a dedupe window"""
+
+DEDUPE_ERROR_RATE = getattr(settings, 'VIEWCOUNT_DEDUPE_ERROR_RATE', 0.001)
@@ -0,0 +1,55 @@
+from datetime import date, timedelta
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from viewcount import settings as viewcount_settings
+from viewcount.hll import HyperLogLog
+from viewcount.models import ViewSketch
+
+
+def get_visitor_key(user, visitor: str) -> str:
+    if user:
+        return f"user:{user.pk}"
+    return f"visitor:{visitor}"
+
+
+def new_sketch() -> HyperLogLog:
+    return HyperLogLog(precision=viewcount_settings.SKETCH_PRECISION)
+
+
+def merge_sketch(content_type_id: int, object_id: int, day: date, sketch: HyperLogLog):
+    """Merge `sketch` into stored sketch of the object in `day`"""
+    lookup = {"content_type_id": content_type_id, "object_id": object_id, "day": day}
+
+    with transaction.atomic():
+        stored = ViewSketch.objects.select_for_update().filter(**lookup).first()
+        if stored:
+            merged = HyperLogLog.from_bytes(stored.registers)
+            if merged.merge(sketch):
+                stored.registers = merged.to_bytes()
+                stored.save(update_fields=['registers'])
+            return
+
+    try:
+        with transaction.atomic():
+            ViewSketch.objects.create(registers=sketch.to_bytes(), **lookup)
+    except IntegrityError:
+        # Another request created the sketch meanwhile
+        merge_sketch(content_type_id, object_id, day, sketch)
+
+
+def estimate_unique_viewers(content_type_id: int, object_id: int, days: int = 1) -> int:
+    """Estimate unique viewers of last `days` days (including today)
+    by merging daily sketches, without scanning views table."""
+    today = timezone.localdate()
+    registers = ViewSketch.objects.filter(
+        content_type_id=content_type_id,
+        object_id=object_id,
+        day__range=(today - timedelta(days=days - 1), today),
+    ).values_list('registers', flat=True)
+
+    merged = new_sketch()
+    for data in registers:
+        merged.merge(HyperLogLog.from_bytes(data))
+    return merged.count()
@@ -0,0 +1,92 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from .bloom import RotatingBloomFilter
+from .hll import HyperLogLog
+from .models import DailyViewRollup, HourlyViewRollup, View
+from .rollups import count_views, get_view_series, prune_views, rollup_views
+
+
+class HyperLogLogTest(SimpleTestCase):
+    def test_small_count(self):
+        hll = HyperLogLog()
+        for i in range(100):
+            hll.add(f"user:{i}")
+            hll.add(f"user:{i}")  # Duplicates don't count
+
+        self.assertEqual(hll.count(), 100)
+
+    def test_large_count(self):
+        hll = HyperLogLog()
+        for i in range(50000):
+            hll.add(f"ip:{i}")
+
+        self.assertAlmostEqual(hll.count(), 50000, delta=50000 * 0.05)
+
+    def test_merge(self):
+        first, second = HyperLogLog(), HyperLogLog()
+        for i in range(3000):
+            first.add(str(i))
+            second.add(str(i + 1000))
+
+        restored = HyperLogLog.from_bytes(first.to_bytes())
+        self.assertTrue(restored.merge(second))
+        self.assertFalse(restored.merge(second))
+        self.assertAlmostEqual(restored.count(), 4000, delta=4000 * 0.05)
+
+
+class RollupTest(TestCase):
+    def setUp(self):
+        self.obj = get_user_model().objects.create_user(email='viewed@gmail.com')
+        self.generic_kwargs = {
+            "content_type_id": ContentType.objects.get_for_model(self.obj).pk,
+            "object_id": self.obj.pk,
+        }
+        self.now = timezone.now().replace(minute=30)
+
+    def _create_views(self, count, hours_ago):
+        View.objects.bulk_create([
+            View(ip='127.0.0.1', created_at=self.now - timedelta(hours=hours_ago), **self.generic_kwargs)
+            for _ in range(count)
+        ])
+
+    def test_rollup_and_prune(self):
+        self._create_views(3, hours_ago=50)
+        self._create_views(2, hours_ago=49)
+        self._create_views(4, hours_ago=0)  # Current hour won't be rolled
+
+        self.assertEqual(rollup_views(now=self.now), 2)
+        self.assertEqual(rollup_views(now=self.now), 0)
+        self.assertEqual(HourlyViewRollup.objects.count(), 2)
+        self.assertEqual(
+            sum(DailyViewRollup.objects.values_list('views', flat=True)), 5
+        )
+
+        self.assertEqual(prune_views(retention_days=1, now=self.now), 5)
+        self.assertEqual(View.objects.count(), 4)
+        self.assertEqual(count_views(**self.generic_kwargs), 9)
+
+        series = get_view_series(interval='hour', days=4, **self.generic_kwargs)
+        self.assertEqual([item['views'] for item in series], [3, 2, 4])
+
+
+class RotatingBloomFilterTest(SimpleTestCase):
+    def test_check_and_add(self):
+        recent = RotatingBloomFilter(window=600, capacity=1000, error_rate=0.001)
+        self.assertFalse(recent.check_and_add('1:1:user:1'))
+        self.assertTrue(recent.check_and_add('1:1:user:1'))
+        self.assertFalse(recent.check_and_add('1:1:user:2'))
+
+    def test_rotation(self):
+        recent = RotatingBloomFilter(window=600, capacity=1000, error_rate=0.001)
+        recent.check_and_add('key')
+
+        recent._rotated_at -= 600  # One window passed, key is in previous filter
+        self.assertTrue(recent.check_and_add('key'))
+
+        recent._rotated_at -= 1200  # Both filters expired
+        self.assertFalse(recent.check_and_add('key'))
@@ -0,0 +1,47 @@
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Sum
+from django.utils.crypto import salted_hmac
+
+from social.models import Counter
+from social.utils import get_counter
+from viewcount.rollups import count_views_bulk
+
+
+def get_view_counts(objects: list) -> dict:
+    """Returns view count of objects keyed by their pk.
+
+    Counts are read from prefetched counters and objects
+    without counter are counted together in one go.
+    """
+    view_counts = {}
+    uncounted_ids = []
+    for obj in objects:
+        if counter := get_counter(obj):
+            view_counts[obj.pk] = counter.views
+        else:
+            uncounted_ids.append(obj.pk)
+
+    if uncounted_ids:
+        content_type = ContentType.objects.get_for_model(objects[0].__class__)
+        view_counts |= count_views_bulk(content_type.pk, uncounted_ids)
+
+    return view_counts
+
+
+def get_view_counts_by_ids(content_type, object_ids: list[int]) -> dict:
+    """Same as `get_view_counts` when only ids of the objects are known,
+    counter shards are summed in one query"""
+    content_type_id = getattr(content_type, 'pk', content_type)
+    view_counts = dict(
+        Counter.objects.filter(content_type_id=content_type_id, object_id__in=object_ids)
+        .values_list('object_id').annotate(views=Sum('views')).order_by()
+    )
+
+    if uncounted_ids := [pk for pk in object_ids if pk not in view_counts]:
+        view_counts |= count_views_bulk(content_type_id, uncounted_ids)
+    return view_counts
+
+
+def get_anonymous_visitor(ip: str, user_agent: str) -> str:
+    """Returns a hash of guest's IP and user agent"""
+    return salted_hmac('viewcount.visitor', f"{ip}|{user_agent}").hexdigest()[:32]